@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
@@ -30,6 +32,10 @@ SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
 
+# Deployed app (Heroku sets DYNO on every dyno; DJANGO_PRODUCTION=true/false overrides the detection).
+# Production refuses settings that only work for one worker process on one machine.
+PRODUCTION = os.getenv('DJANGO_PRODUCTION', str('DYNO' in os.environ)).lower() in ('1', 'true', 'yes')
+
 ALLOWED_HOSTS = [
   '127.0.0.1', 
   'localhost', 
@@ -58,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'recipes.middleware.RequestTimingMiddleware', # First, so its total includes the other middleware
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -151,8 +158,18 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Heroku: Update database configuration from $DATABASE_URL.
+# - DB_CONN_MAX_AGE: seconds a worker thread keeps its connection open between requests.
+# - DB_CONN_HEALTH_CHECKS: check a persistent connection is still alive before reusing it.
+# - DB_PGBOUNCER: set when DATABASE_URL points at PgBouncer in transaction pooling mode (e.g. the
+#   heroku-buildpack-pgbouncer sidecar), which bounds the PostgreSQL connections of all workers to its
+#   pool size. Server-side cursors (QuerySet.iterator()) do not survive transaction pooling, so they are
+#   disabled. Django 4.2 has no connection pool of its own (one arrives in 5.1 with psycopg 3).
 import dj_database_url
-db_from_env = dj_database_url.config(conn_max_age=500)
+db_from_env = dj_database_url.config(
+  conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', 500)),
+  conn_health_checks=os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+  disable_server_side_cursors=os.getenv('DB_PGBOUNCER', 'false').lower() in ('1', 'true', 'yes'),
+)
 DATABASES['default'].update(db_from_env)
 
 CLOUDINARY_STORAGE = {
@@ -161,4 +178,77 @@ CLOUDINARY_STORAGE = {
     'API_SECRET': os.getenv('CLOUDINARY_API_SECRET'),
 }
 
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+# Uploaded pictures (and their resized variants) go to Cloudinary when it is configured,
+# otherwise to the local MEDIA_ROOT (served by recipes/urls.py in DEBUG mode).
+# Production requires Cloudinary: a dyno's disk is wiped on every restart.
+if all(CLOUDINARY_STORAGE.values()):
+  DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+elif PRODUCTION:
+  missing = ', '.join(f'CLOUDINARY_{key}' for key, value in CLOUDINARY_STORAGE.items() if not value)
+  raise ImproperlyConfigured(f'Set {missing}: uploaded pictures must not be stored on the ephemeral local disk.')
+else:
+  DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
+# Picture uploads are staged in RECIPE_IMAGE_STAGING_DIR and processed (resized, stripped of metadata and
+# stored) by RECIPE_IMAGE_WORKERS background threads per web process. With 0 threads, run
+# `manage.py process_recipe_images` on the same machine instead (it also retries failed uploads).
+RECIPE_IMAGE_STAGING_DIR = os.getenv('RECIPE_IMAGE_STAGING_DIR', str(BASE_DIR / 'upload_staging'))
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', 2))
+
+# Cache backend (recipe version stamps and template fragments), chosen by CACHE_URL:
+# - unset: per-process local memory (development and tests only: a write in one gunicorn worker
+#   would leave stale charts and page validators in the others)
+# - file:///path/to/dir: file-based cache shared by the workers on one machine (stamp increments aren't atomic)
+# - redis://host:port/db (or rediss://): Redis-compatible server shared by every worker and dyno (required in production)
+CACHE_URL = os.getenv('CACHE_URL', '')
+if PRODUCTION and not CACHE_URL.startswith(('redis://', 'rediss://')):
+  raise ImproperlyConfigured('Set CACHE_URL to a shared Redis cache (redis://...): the recipe version stamps must be shared by every worker.')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+  CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL.startswith('file://'):
+  CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': CACHE_URL[len('file://'):]}}
+else:
+  CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bitebase'}}
+CACHES['default']['KEY_PREFIX'] = 'bitebase'
+if not CACHE_URL.startswith(('redis://', 'rediss://')):
+  CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000))}
+
+# Seconds a recipe (and a user's hidden recipe ids) may stay in the object cache
+RECIPE_CACHE_TIMEOUT = int(os.getenv('RECIPE_CACHE_TIMEOUT', 300))
+
+# Maximum size (in bytes) of rendered charts kept in each worker's LRU chart cache
+CHART_CACHE_MAX_BYTES = int(os.getenv('CHART_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+# Number of recipes shown per page on the recipes list
+RECIPES_PAGE_SIZE = int(os.getenv('RECIPES_PAGE_SIZE', 24))
+
+# Number of recipes inserted per bulk_create batch by recipe imports (import_recipes, api/recipes/import/)
+RECIPE_IMPORT_BATCH_SIZE = int(os.getenv('RECIPE_IMPORT_BATCH_SIZE', 1000))
+
+# Request timing (recipes/middleware.py):
+# - REQUEST_TIMING_HEADER: add a Server-Timing header (total, db and named spans) to every response.
+#   Defaults to DEBUG: the header shows query counts and timings to any client.
+# - REQUEST_TIMING_STATS: keep rolling per-view percentiles, served as JSON at /_timings/ to local requests.
+# - REQUEST_TIMING_LOG_LEVEL: level of the 'recipes.timing' logger. The per-request JSON lines are logged
+#   at INFO, so they are off unless it is set to INFO (or DEBUG).
+REQUEST_TIMING_HEADER = os.getenv('REQUEST_TIMING_HEADER', str(DEBUG)).lower() in ('1', 'true', 'yes')
+REQUEST_TIMING_STATS = os.getenv('REQUEST_TIMING_STATS', 'false').lower() in ('1', 'true', 'yes')
+
+LOGGING = {
+  'version': 1,
+  'disable_existing_loggers': False,
+  'handlers': {
+    'console': {'class': 'logging.StreamHandler'},
+  },
+  'loggers': {
+    'recipes.timing': {
+      'handlers': ['console'],
+      'level': os.getenv('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+      'propagate': False,
+    },
+  },
+}
+
+# Release identifier, part of the recipe page ETags so browsers re-fetch pages after a deploy
+# (HEROKU_RELEASE_VERSION is set by Heroku's runtime dyno metadata)
+RELEASE_VERSION = os.getenv('RELEASE_VERSION', os.getenv('HEROKU_RELEASE_VERSION', ''))
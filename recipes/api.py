@@ -0,0 +1,299 @@
+"""
+JSON API for recipes (session authenticated, same visibility rules and validation as the HTML views).
+
+- GET    api/recipes/        List the visible recipes: search filters of the recipe list (q, recipe_name,
+                             ingredient, difficulty), cursor pagination (after/before, page_size),
+                             or a batch of recipes by id (ids=1,2,3) in one query.
+- POST   api/recipes/        Create a recipe (JSON or multipart form data, validated by CreateRecipeForm).
+- GET    api/recipes/<pk>/   Recipe detail.
+- PATCH  api/recipes/<pk>/   Update some fields (PUT: all fields), as JSON or form data. Edits to public recipes
+                             create a private copy.
+- DELETE api/recipes/<pk>/   Delete the recipe (public recipes are hidden from the user instead).
+- POST   api/recipes/import/ Import recipes from an uploaded CSV or JSON Lines file (see recipes/bulk.py).
+- GET    api/recipes/export/ Stream the visible recipes (optionally filtered) as CSV or JSON Lines (?format=).
+
+Every GET accepts ?fields=id,name,... to return (and fetch) only those fields.
+Responses are encoded with orjson when it is installed, otherwise with the standard json module.
+"""
+
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.files.storage import default_storage
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, QueryDict, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods
+
+from .bulk import FORMATS, export_recipes, get_format, import_recipes
+from .forms import CreateRecipeForm
+from .models import HiddenRecipe, Recipe
+from .search import get_search_backend
+from .views import filter_recipes, get_keyset_page, get_search_filters, get_visible_recipe, is_recipe_id, parse_cursor
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+# Largest page (and id batch) a client can request
+API_MAX_PAGE_SIZE = 100
+
+def encode_json(data):
+  """ Serializes data to JSON bytes (orjson if available, otherwise json with Django's encoder). """
+  if orjson is not None:
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+  return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+def api_response(data, status=200):
+  """ Returns data as a JSON response. """
+  return HttpResponse(encode_json(data), status=status, content_type='application/json')
+
+def api_error(message, status=400, **extra):
+  """ Returns an error response: {"error": message, ...}. """
+  return api_response({'error': message, **extra}, status=status)
+
+def api_login_required(view):
+  """ Like login_required, but answers 401 (instead of redirecting to the login page). """
+  @wraps(view)
+  def wrapper(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+      return api_error('Authentication required.', status=401)
+    return view(request, *args, **kwargs)
+  return wrapper
+
+def get_pic(recipe):
+  """ Picture URL and variant URLs ({format: {width: url}}); no URLs while a new upload is processed. """
+  if recipe.is_pic_pending():
+    return {'status': recipe.get_pic_status_display(), 'url': None, 'variants': {}}
+  return {
+    'status': recipe.get_pic_status_display(),
+    'url': recipe.pic.url,
+    'variants': {
+      extension: {width: default_storage.url(name) for width, name in names.items()}
+      for extension, names in recipe.pic_variants.items()
+    },
+  }
+
+# API fields: (model fields to load, value getter)
+API_FIELDS = {
+  'id': (['id'], lambda recipe: recipe.pk),
+  'name': (['name'], lambda recipe: recipe.name),
+  'cooking_time': (['cooking_time'], lambda recipe: recipe.cooking_time),
+  'ingredients': (['ingredients'], lambda recipe: recipe.return_ingredients_as_list()),
+  'difficulty': (['difficulty'], lambda recipe: recipe.get_difficulty_display()),
+  'description': (['description'], lambda recipe: recipe.description),
+  'pic': (['pic', 'pic_status', 'pic_variants'], get_pic),
+  'is_public': (['user'], lambda recipe: recipe.is_public()),
+  'updated_at': (['updated_at'], lambda recipe: recipe.updated_at),
+}
+
+def get_fields(request):
+  """ Returns the requested API fields (?fields=a,b; all by default), or raises ValueError for unknown ones. """
+  value = request.GET.get('fields', '')
+  if not value:
+    return list(API_FIELDS)
+  fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+  unknown = [field for field in fields if field not in API_FIELDS]
+  if unknown:
+    raise ValueError(f'Unknown fields: {", ".join(unknown)}.')
+  return fields
+
+def only_fields(qs_recipes, fields):
+  """ Loads only the model fields behind the API fields (plus the id). """
+  model_fields = {'id'}
+  for field in fields:
+    model_fields.update(API_FIELDS[field][0])
+  return qs_recipes.only(*model_fields)
+
+def serialize_recipe(recipe, fields):
+  """ Returns the API representation of a recipe, limited to fields. """
+  return {field: API_FIELDS[field][1](recipe) for field in fields}
+
+def parse_ids(value):
+  """ Parses a comma-separated id list (?ids=1,2,3); raises ValueError for invalid or too many ids. """
+  try:
+    ids = list(dict.fromkeys(int(pk) for pk in value.split(',') if pk.strip()))
+    if not all(is_recipe_id(pk) for pk in ids):
+      raise ValueError
+  except ValueError:
+    raise ValueError('ids must be a comma-separated list of recipe ids.') from None
+  if len(ids) > API_MAX_PAGE_SIZE:
+    raise ValueError(f'At most {API_MAX_PAGE_SIZE} ids can be fetched at once.')
+  return ids
+
+def get_page_size(request):
+  """ Returns the requested page size (?page_size), capped at API_MAX_PAGE_SIZE. """
+  try:
+    page_size = int(request.GET.get('page_size', settings.RECIPES_PAGE_SIZE))
+  except ValueError:
+    page_size = settings.RECIPES_PAGE_SIZE
+  return min(max(page_size, 1), API_MAX_PAGE_SIZE)
+
+# Request bodies accepted for creating and updating recipes
+FORM_CONTENT_TYPES = ('multipart/form-data', 'application/x-www-form-urlencoded')
+
+class UnsupportedMediaType(ValueError):
+  """ Raised for a request body that is neither JSON nor form data (answered with 415). """
+
+def get_form_data(request, recipe=None, partial=False):
+  """
+  Returns the submitted recipe data and files for CreateRecipeForm: a JSON object or form data.
+  Partial updates keep the current values of the fields that aren't submitted.
+  Ingredients may be sent as a list. Raises ValueError for malformed JSON and UnsupportedMediaType
+  for other content types.
+  """
+  if request.content_type == 'application/json':
+    try:
+      data = json.loads(request.body or b'{}')
+    except ValueError:
+      raise ValueError('Invalid JSON.') from None
+    if not isinstance(data, dict):
+      raise ValueError('Expected a JSON object.')
+    files = {}
+  elif request.content_type not in FORM_CONTENT_TYPES:
+    raise UnsupportedMediaType('Send the recipe as JSON or form data.')
+  elif request.method == 'POST':
+    data, files = request.POST.dict(), request.FILES
+  elif request.content_type == 'multipart/form-data':
+    # Django only parses the form body of POST requests
+    post, files = request.parse_file_upload(request.META, request)
+    data = post.dict()
+  else:
+    data, files = QueryDict(request.body, encoding=request.encoding).dict(), {}
+  if isinstance(data.get('ingredients'), list):
+    data['ingredients'] = ', '.join(str(ingredient) for ingredient in data['ingredients'])
+  if partial and recipe is not None:
+    data = {**model_to_dict(recipe, fields=['name', 'cooking_time', 'ingredients', 'description']), **data}
+  return data, files
+
+@api_login_required
+@require_http_methods(['GET', 'POST'])
+def recipe_list_api(request):
+  """ List (or batch fetch) the visible recipes, or create a recipe. """
+  if request.method == 'POST':
+    return create_recipe_api(request)
+
+  try:
+    fields = get_fields(request)
+    ids = parse_ids(request.GET['ids']) if 'ids' in request.GET else None
+  except ValueError as error:
+    return api_error(str(error))
+
+  qs_recipes = only_fields(Recipe.objects.visible_to(request.user), fields)
+
+  if ids is not None:
+    # Batch fetch: one query for all the ids; ids that don't exist or aren't visible are reported as missing
+    recipes = {recipe.pk: recipe for recipe in qs_recipes.filter(pk__in=ids)}
+    return api_response({
+      'results': [serialize_recipe(recipes[pk], fields) for pk in ids if pk in recipes],
+      'missing': [pk for pk in ids if pk not in recipes],
+    })
+
+  filters = get_search_filters(request)
+  qs_recipes = filter_recipes(qs_recipes, filters)
+  ranked = bool(filters['q'] or filters['recipe_name'])
+  if ranked:
+    qs_recipes = get_search_backend().annotate(qs_recipes, text=filters['q'], name=filters['recipe_name'])
+
+  recipes, next_cursor, previous_cursor = get_keyset_page(
+    qs_recipes,
+    after=parse_cursor(request.GET.get('after'), ranked),
+    before=parse_cursor(request.GET.get('before'), ranked),
+    page_size=get_page_size(request),
+    rank_field='search_rank' if ranked else None,
+  )
+  return api_response({
+    'results': [serialize_recipe(recipe, fields) for recipe in recipes],
+    'next': next_cursor,
+    'previous': previous_cursor,
+  })
+
+def create_recipe_api(request):
+  """ Create a recipe (public when created by a superuser, like the HTML form). """
+  try:
+    data, files = get_form_data(request)
+  except UnsupportedMediaType as error:
+    return api_error(str(error), status=415)
+  except ValueError as error:
+    return api_error(str(error))
+
+  form = CreateRecipeForm(data, files)
+  if not form.is_valid():
+    return api_error('Invalid recipe.', errors=form.errors.get_json_data())
+  recipe = form.save(commit=False)
+  recipe.user = None if request.user.is_superuser else request.user
+  recipe.save()
+  return api_response(serialize_recipe(recipe, list(API_FIELDS)), status=201)
+
+@api_login_required
+@require_http_methods(['GET', 'PUT', 'PATCH', 'POST', 'DELETE'])
+def recipe_detail_api(request, pk):
+  """ Read, update (PUT/PATCH, or POST with form data) or delete a visible recipe. """
+  recipe = get_visible_recipe(request, pk)
+  if recipe is None:
+    return api_error('The recipe does not exist.', status=404)
+
+  if request.method == 'GET':
+    try:
+      fields = get_fields(request)
+    except ValueError as error:
+      return api_error(str(error))
+    return api_response(serialize_recipe(recipe, fields))
+
+  if request.method == 'DELETE':
+    if recipe.is_public() and not request.user.is_superuser:
+      # Public recipes are shared, so only hide it from this user
+      HiddenRecipe.objects.get_or_create(user=request.user, recipe=recipe)
+    else:
+      recipe.delete()
+    return HttpResponse(status=204)
+
+  try:
+    data, files = get_form_data(request, recipe, partial=request.method != 'PUT')
+  except UnsupportedMediaType as error:
+    return api_error(str(error), status=415)
+  except ValueError as error:
+    return api_error(str(error))
+
+  form = CreateRecipeForm(data, files, instance=recipe)
+  if not form.is_valid():
+    return api_error('Invalid recipe.', errors=form.errors.get_json_data())
+  if recipe.is_public() and not request.user.is_superuser:
+    # Copy-on-write: the edits are saved as the user's own copy (a new id) and the public recipe is hidden
+    recipe = form.save(commit=False)
+    recipe.save_as_private_copy(request.user)
+  else:
+    recipe = form.save()
+  return api_response(serialize_recipe(recipe, list(API_FIELDS)))
+
+@api_login_required
+@require_http_methods(['POST'])
+def recipe_import_api(request):
+  """ Import recipes from an uploaded file ("file"), owned by the user (public for superusers). """
+  upload = request.FILES.get('file')
+  if upload is None:
+    return api_error('Upload a CSV or JSON Lines file as "file".')
+  try:
+    file_format = get_format(upload.name, request.POST.get('format', ''))
+  except ValueError as error:
+    return api_error(str(error))
+
+  user = None if request.user.is_superuser else request.user
+  result = import_recipes(upload, file_format, user, settings.RECIPE_IMPORT_BATCH_SIZE)
+  return api_response(result, status=201 if result['created'] else 400)
+
+@api_login_required
+@require_http_methods(['GET'])
+def recipe_export_api(request):
+  """ Stream the visible recipes matching the search filters as a CSV (default) or JSON Lines download. """
+  try:
+    file_format = get_format('', request.GET.get('format', 'csv'))
+  except ValueError as error:
+    return api_error(str(error))
+
+  qs_recipes = filter_recipes(Recipe.objects.visible_to(request.user), get_search_filters(request))
+  response = StreamingHttpResponse(export_recipes(qs_recipes, file_format), content_type=FORMATS[file_format])
+  response['Content-Disposition'] = f'attachment; filename="recipes.{file_format}"'
+  return response
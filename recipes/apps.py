@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class RecipesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
+
+    def ready(self):
+        post_migrate.connect(install_search_triggers, sender=self)
+
+def install_search_triggers(using, **kwargs):
+    """ Restores the search index triggers, which SQLite drops whenever a migration rebuilds the recipe table. """
+    from django.db import connections
+    from .search import get_search_backend
+
+    backend = get_search_backend(connections[using])
+    if getattr(backend, 'table', None) not in connections[using].introspection.table_names():
+        return # The search index isn't installed yet (migrated to an earlier state)
+    with connections[using].cursor() as cursor:
+        backend.install_triggers(cursor)
@@ -0,0 +1,147 @@
+"""
+Bulk recipe import and export in CSV or JSON Lines (manage.py import_recipes, api/recipes/import/ and
+api/recipes/export/).
+Imports read the file one row at a time, validate each row with the CreateRecipeForm field rules, compute
+the difficulties of a whole batch in one vectorized pass and insert the batch with bulk_create.
+Exports stream rows from a chunked database iterator, so memory stays flat however many recipes are exported.
+"""
+
+import csv
+import io
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .cache import bump_recipes_version
+from .forms import CreateRecipeForm
+from .models import Difficulty, Recipe
+
+# Supported file formats and their content types
+FORMATS = {
+  'csv': 'text/csv',
+  'jsonl': 'application/x-ndjson',
+}
+
+# Columns read by imports (other columns, such as an exported id or difficulty, are ignored)
+IMPORT_FIELDS = ('name', 'cooking_time', 'ingredients', 'description')
+
+# Columns written by exports
+EXPORT_FIELDS = ('id', 'name', 'cooking_time', 'ingredients', 'description', 'difficulty')
+
+# Invalid rows reported in detail by an import (all of them are counted)
+MAX_REPORTED_ERRORS = 100
+
+# Rows joined into each chunk of a streamed export
+EXPORT_CHUNK_SIZE = 1000
+
+def get_format(filename, requested=''):
+  """ Returns the file format: the requested one, or else the one matching the file extension. """
+  file_format = (requested or os.path.splitext(filename or '')[1].lstrip('.')).lower()
+  file_format = {'ndjson': 'jsonl'}.get(file_format, file_format)
+  if file_format not in FORMATS:
+    raise ValueError('Unsupported format: use a .csv or .jsonl file (or pass the format).')
+  return file_format
+
+def read_rows(file, file_format):
+  """
+  Yields (line number, row) for each record of a binary file, reading it one line at a time.
+  Rows are dicts, or None for lines that aren't valid JSON.
+  """
+  text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+  try:
+    if file_format == 'csv':
+      reader = csv.DictReader(text)
+      for row in reader:
+        yield reader.line_num, row
+    else:
+      for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+          continue
+        try:
+          yield line_number, json.loads(line)
+        except ValueError:
+          yield line_number, None
+  finally:
+    text.detach() # Leave the caller's file open
+
+def validate_row(form_fields, row):
+  """ Cleans a row with the CreateRecipeForm field rules; returns (cleaned data, errors by field). """
+  if not isinstance(row, dict):
+    return None, {'__all__': ['Invalid JSON.' if row is None else 'Expected a JSON object.']}
+  cleaned, errors = {}, {}
+  for name in IMPORT_FIELDS:
+    value = row.get(name)
+    if name == 'ingredients' and isinstance(value, list):
+      value = ', '.join(str(ingredient) for ingredient in value)
+    try:
+      cleaned[name] = form_fields[name].clean(value)
+    except ValidationError as error:
+      errors[name] = error.messages
+  return cleaned, errors
+
+def insert_batch(rows, user):
+  """ Inserts validated rows with bulk_create (which computes the missing difficulties in one vectorized pass). """
+  recipes = [Recipe(user=user, **row) for row in rows]
+  with transaction.atomic():
+    Recipe.objects.bulk_create(recipes)
+  return len(recipes)
+
+def import_recipes(file, file_format, user=None, batch_size=1000):
+  """
+  Imports recipes owned by user (public recipes when None) from a CSV or JSON Lines binary file.
+  Invalid rows are skipped; each batch of valid rows is committed on its own.
+  Returns {'created', 'invalid', 'errors': [{'line', 'errors'}, ...]} (the first MAX_REPORTED_ERRORS invalid rows).
+  """
+  form_fields = CreateRecipeForm().fields
+  result = {'created': 0, 'invalid': 0, 'errors': []}
+  batch = []
+  for line_number, row in read_rows(file, file_format):
+    cleaned, errors = validate_row(form_fields, row)
+    if errors:
+      result['invalid'] += 1
+      if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append({'line': line_number, 'errors': errors})
+      continue
+    batch.append(cleaned)
+    if len(batch) >= batch_size:
+      result['created'] += insert_batch(batch, user)
+      batch = []
+  if batch:
+    result['created'] += insert_batch(batch, user)
+
+  if result['created']:
+    bump_recipes_version(user.pk if user else None) # Invalidate cached charts for the recipe owner
+  return result
+
+class Echo:
+  """ File-like object returning what is written, so csv.writer can format rows for a stream. """
+
+  def write(self, value):
+    return value
+
+def export_recipes(qs_recipes, file_format):
+  """
+  Yields the recipes as CSV or JSON Lines text, in chunks of EXPORT_CHUNK_SIZE rows.
+  Rows are read with a chunked iterator (a server-side cursor on PostgreSQL), never all at once.
+  """
+  labels = dict(Difficulty.choices)
+  rows = qs_recipes.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+  writer = csv.writer(Echo())
+
+  if file_format == 'csv':
+    format_row = writer.writerow
+    yield writer.writerow(EXPORT_FIELDS)
+  else:
+    def format_row(row):
+      return json.dumps(dict(zip(EXPORT_FIELDS, row)), separators=(',', ':')) + '\n'
+
+  chunk = []
+  for row in rows:
+    chunk.append(format_row((*row[:-1], labels.get(row[-1], row[-1]))))
+    if len(chunk) >= EXPORT_CHUNK_SIZE:
+      yield ''.join(chunk)
+      chunk = []
+  if chunk:
+    yield ''.join(chunk)
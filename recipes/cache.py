@@ -0,0 +1,114 @@
+"""
+Caching helpers for BiteBase.
+Tracks a version stamp for each user's recipes, names the recipe object cache entries
+and keeps rendered charts in a size-bounded LRU cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+PUBLIC_SCOPE = 'public' # Version key used for public recipes (user=None)
+
+def _version_key(user_id):
+  """ Returns the cache key holding the version stamp for a user's recipes (or the public recipes). """
+  return f'recipes:version:{user_id if user_id is not None else PUBLIC_SCOPE}'
+
+def _initial_version():
+  """
+  Returns the starting stamp of a missing version key: the current time in microseconds, so a stamp
+  evicted from the cache restarts above every value it had before (one microsecond per write at most).
+  """
+  return time.time_ns() // 1000
+
+def get_recipes_version(user_id):
+  """
+  Returns the current version stamp (an integer) for a user's recipes.
+  A missing stamp (first request or evicted from the cache) is initialized by _initial_version.
+  """
+  key = _version_key(user_id)
+  version = cache.get(key)
+  if version is None:
+    cache.add(key, _initial_version(), timeout=None)
+    version = cache.get(key, _initial_version())
+  return version
+
+def bump_recipes_version(user_id):
+  """
+  Marks a user's recipes (or the public recipes when user_id is None) as changed.
+  The increment is atomic on Redis (and within one process on the local memory cache), so concurrent
+  writes never share a stamp. The stamps must live in a cache shared by every worker (see CACHE_URL).
+  """
+  key = _version_key(user_id)
+  cache.add(key, _initial_version(), timeout=None)
+  try:
+    cache.incr(key)
+  except ValueError:
+    # Evicted between add() and incr(): a fresh stamp is already newer than the evicted one
+    cache.add(key, _initial_version(), timeout=None)
+
+def get_scope_version(user):
+  """
+  Returns the combined version stamp for every recipe a user can see.
+  Includes the public recipes so writes by the superuser invalidate everyone's charts.
+  """
+  return (get_recipes_version(user.id), get_recipes_version(None))
+
+def recipe_cache_key(recipe_id):
+  """ Returns the cache key holding a cached Recipe instance (see RecipeQuerySet.get_cached). """
+  return f'recipes:recipe:{recipe_id}'
+
+def hidden_recipes_cache_key(user_id):
+  """ Returns the cache key holding the ids of the public recipes a user has hidden, valid until the user's next write. """
+  return f'recipes:hidden:{user_id}:{get_recipes_version(user_id)!r}'
+
+class ChartCache:
+  """
+  Thread-safe LRU cache for rendered charts.
+  Entries are evicted least-recently-used first once the total size exceeds max_bytes.
+  """
+
+  def __init__(self, max_bytes):
+    self.max_bytes = max_bytes
+    self.current_bytes = 0
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key):
+    """ Returns the cached chart for key (marking it as recently used) or None. """
+    with self._lock:
+      chart = self._entries.get(key)
+      if chart is not None:
+        self._entries.move_to_end(key)
+      return chart
+
+  def set(self, key, chart):
+    """ Stores a chart and evicts the oldest entries until the cache fits its size budget. """
+    size = len(chart)
+    if size > self.max_bytes:
+      return # Never cache a chart larger than the whole budget
+
+    with self._lock:
+      if key in self._entries:
+        self.current_bytes -= len(self._entries.pop(key))
+      self._entries[key] = chart
+      self.current_bytes += size
+
+      while self.current_bytes > self.max_bytes:
+        _, evicted = self._entries.popitem(last=False)
+        self.current_bytes -= len(evicted)
+
+  def clear(self):
+    """ Removes every cached chart. """
+    with self._lock:
+      self._entries.clear()
+      self.current_bytes = 0
+
+  def __len__(self):
+    return len(self._entries)
+
+# Shared chart cache for this worker process (default budget: 32 MB)
+chart_cache = ChartCache(getattr(settings, 'CHART_CACHE_MAX_BYTES', 32 * 1024 * 1024))
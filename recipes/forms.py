@@ -67,8 +67,19 @@ DIFFICULTY_CHOICES = (
 
 class RecipeSearchForm(forms.Form):
   """
-  Form for searching recipes based on name, ingredients, difficulty, and chart type.
+  Form for searching recipes based on keywords, name, ingredients, difficulty, and chart type.
+  Keyword and name searches use the full-text search backend (see recipes/search.py).
   """
+  q = forms.CharField(
+    max_length=200,
+    required=False,
+    label='Keywords',
+    widget=forms.TextInput(attrs={
+      'class': 'form-control',
+      'placeholder': 'Search names, ingredients and descriptions...'
+    })
+  )
+
   recipe_name = forms.CharField(
     max_length=120,
     required=False,
@@ -0,0 +1,168 @@
+"""
+Responsive image variants for recipe pictures.
+Uploaded pictures are resized with Pillow into a few widths (list card, detail page, retina detail)
+and encoded as WebP, plus AVIF when the installed Pillow can write it. Recipe.pic_variants records
+the stored names; templates emit them as <picture> sources with a srcset (see templatetags/recipe_images.py).
+
+Uploads are processed in the background: Recipe.save stages a new upload on the local disk and marks the
+recipe pending, then a thread pool (or the process_recipe_images command) strips the metadata, generates
+the variants and uploads everything to DEFAULT_FILE_STORAGE (see Recipe.process_staged_pic).
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Variant widths in pixels: list card, detail page (also the card's 2x) and retina detail page
+CARD_WIDTH = 400
+DETAIL_WIDTH = 800
+RETINA_WIDTH = 1600
+VARIANT_WIDTHS = (CARD_WIDTH, DETAIL_WIDTH, RETINA_WIDTH)
+
+# Directory (inside the storage) holding the variants, named by content hash and width
+VARIANTS_DIR = 'recipes/variants'
+
+# (extension, Pillow format, MIME type, save options), smallest first: browsers use the first <source> they support
+VARIANT_FORMATS = (
+  ('avif', 'AVIF', 'image/avif', {'quality': 50}),
+  ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+)
+
+# Rendered width of the picture for each template size (the sizes attribute of <img>)
+PICTURE_SIZES = {
+  'card': '(min-width: 992px) 25vw, (min-width: 768px) 33vw, (min-width: 576px) 50vw, 100vw',
+  'detail': '(min-width: 992px) 800px, 100vw',
+}
+
+# Largest variant offered for each template size
+PICTURE_MAX_WIDTHS = {
+  'card': DETAIL_WIDTH,
+  'detail': RETINA_WIDTH,
+}
+
+@lru_cache(maxsize=None)
+def get_variant_formats():
+  """ Returns the entries of VARIANT_FORMATS the installed Pillow can write. """
+  from PIL import Image
+  try:
+    import pillow_avif # noqa: F401 (registers AVIF support on Pillow versions without it)
+  except ImportError:
+    pass
+  Image.init()
+  return tuple(variant_format for variant_format in VARIANT_FORMATS if variant_format[1] in Image.SAVE)
+
+def get_staging_storage():
+  """ Returns the local storage where uploads wait to be processed (RECIPE_IMAGE_STAGING_DIR). """
+  return FileSystemStorage(location=settings.RECIPE_IMAGE_STAGING_DIR)
+
+def strip_metadata(data):
+  """
+  Re-encodes an image (bytes) in its own format with EXIF orientation applied and metadata (EXIF, GPS, comments) dropped.
+  Returns the data unchanged if Pillow can't read or write it.
+  """
+  from PIL import Image, ImageOps
+
+  try:
+    with Image.open(BytesIO(data)) as original:
+      image_format = original.format
+      image = ImageOps.exif_transpose(original)
+      if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+      buffer = BytesIO()
+      options = {'quality': 90, 'optimize': True} if image_format == 'JPEG' else {}
+      image.save(buffer, image_format, **options)
+      return buffer.getvalue()
+  except (OSError, ValueError, KeyError, Image.DecompressionBombError):
+    return data
+
+def generate_variants(data, storage=None):
+  """
+  Resizes an image (bytes) to VARIANT_WIDTHS (never upscaling) in every supported format,
+  saves the variants to storage and returns their names as {extension: {width: name}}.
+  EXIF orientation is applied and metadata is dropped. Returns {} if Pillow can't read the image.
+  """
+  from PIL import Image, ImageOps
+
+  storage = storage or default_storage
+  digest = hashlib.sha256(data).hexdigest()[:16]
+  try:
+    with Image.open(BytesIO(data)) as original:
+      image = ImageOps.exif_transpose(original)
+      if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('LA', 'PA') or 'transparency' in image.info else 'RGB')
+
+      variants = {}
+      for width in sorted({min(width, image.width) for width in VARIANT_WIDTHS}):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for extension, pil_format, _, options in get_variant_formats():
+          name = f'{VARIANTS_DIR}/{digest}-{width}.{extension}'
+          if not storage.exists(name): # Same upload (e.g. a copied recipe): reuse its variants
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            name = storage.save(name, ContentFile(buffer.getvalue()))
+          variants.setdefault(extension, {})[str(width)] = name
+      return variants
+  except (OSError, ValueError, Image.DecompressionBombError):
+    return {}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+  """ Returns this process's image processing thread pool (RECIPE_IMAGE_WORKERS threads), started on first use. """
+  global _executor
+  with _executor_lock:
+    if _executor is None:
+      _executor = ThreadPoolExecutor(max_workers=settings.RECIPE_IMAGE_WORKERS, thread_name_prefix='recipe-images')
+    return _executor
+
+def process_recipe_image(recipe_id):
+  """
+  Processes the staged upload of a recipe (if it still has one), in its own database connection.
+  Returns True if this call stored the picture; errors are logged (the recipe is marked failed).
+  """
+  from .models import Recipe
+
+  close_old_connections()
+  try:
+    recipe = Recipe.objects.filter(pk=recipe_id).exclude(pic_staged='').first()
+    return recipe is not None and recipe.process_staged_pic()
+  except Exception:
+    logger.exception('Processing the picture of recipe %s failed', recipe_id)
+    return False
+  finally:
+    close_old_connections()
+
+def enqueue_recipe_image(recipe_id):
+  """
+  Queues the staged upload of a recipe for the background threads. With RECIPE_IMAGE_WORKERS = 0
+  nothing runs in the web process and the process_recipe_images command picks the recipe up.
+  """
+  if settings.RECIPE_IMAGE_WORKERS > 0:
+    get_executor().submit(process_recipe_image, recipe_id)
+
+def get_picture_sources(pic_variants, size, storage=None):
+  """
+  Returns the <source> entries ({'type', 'srcset'}) of a recipe picture rendered at size ('card' or 'detail').
+  """
+  storage = storage or default_storage
+  max_width = PICTURE_MAX_WIDTHS[size]
+  sources = []
+  for extension, _, mime_type, _ in VARIANT_FORMATS:
+    widths = sorted((int(width), name) for width, name in (pic_variants or {}).get(extension, {}).items())
+    candidates = [(width, name) for width, name in widths if width <= max_width] or widths[:1]
+    if candidates:
+      srcset = ', '.join(f'{storage.url(name)} {width}w' for width, name in candidates)
+      sources.append({'type': mime_type, 'srcset': srcset})
+  return sources
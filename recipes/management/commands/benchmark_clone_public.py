@@ -0,0 +1,76 @@
+"""
+Benchmark for cloning public recipes into a user's account.
+Compares database round trips and time of the per-recipe Recipe.objects.create loop
+against the batched Recipe.objects.clone_public_for().
+"""
+
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Difficulty, Recipe
+
+class Rollback(Exception):
+  """ Raised to roll back the benchmark data once measurements are taken. """
+
+class Command(BaseCommand):
+  help = 'Reports round trips and time for cloning N public recipes (all data is rolled back).'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Numbers of public recipes to clone')
+
+  def handle(self, *args, **options):
+    results = []
+    for size in options['sizes']:
+      try:
+        with transaction.atomic():
+          results.append(self.run_size(size))
+          raise Rollback
+      except Rollback:
+        pass
+
+    self.stdout.write(json.dumps(results, indent=2))
+
+  def run_size(self, size):
+    """ Seeds size public recipes and measures both clone paths for two fresh users. """
+    Recipe.objects.bulk_create([
+      Recipe(
+        name=f'Benchmark Recipe {i}',
+        cooking_time=i % 90,
+        ingredients='flour, sugar, eggs, butter',
+        difficulty=Difficulty.HARD,
+        description='Benchmark recipe',
+      )
+      for i in range(size)
+    ])
+    loop_user = User.objects.create(username=f'benchmark-loop-{size}')
+    bulk_user = User.objects.create(username=f'benchmark-bulk-{size}')
+
+    with CaptureQueriesContext(connection) as loop_queries:
+      start = time.perf_counter()
+      for recipe in Recipe.objects.filter(user__isnull=True):
+        Recipe.objects.create(
+          user=loop_user,
+          name=recipe.name,
+          cooking_time=recipe.cooking_time,
+          ingredients=recipe.ingredients,
+          difficulty=recipe.difficulty,
+          description=recipe.description,
+          pic=recipe.pic,
+        )
+      loop_seconds = time.perf_counter() - start
+
+    with CaptureQueriesContext(connection) as bulk_queries:
+      start = time.perf_counter()
+      Recipe.objects.clone_public_for(bulk_user)
+      bulk_seconds = time.perf_counter() - start
+
+    return {
+      'public_recipes': size,
+      'loop': {'queries': len(loop_queries), 'seconds': round(loop_seconds, 4)},
+      'clone_public_for': {'queries': len(bulk_queries), 'seconds': round(bulk_seconds, 4)},
+    }
@@ -0,0 +1,56 @@
+"""
+Benchmark for template fragment caching.
+Renders recipes_list.html for N recipes with an empty fragment cache (every card rendered)
+and with a warm one (cards served from the cache), and reports the median render times.
+"""
+
+import json
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from recipes.forms import RecipeSearchForm
+from recipes.models import Recipe
+
+class Command(BaseCommand):
+  help = 'Reports recipes_list.html render time for N recipes with a cold and a warm fragment cache.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--recipes', type=int, default=500, help='Recipe cards on the page')
+    parser.add_argument('--runs', type=int, default=20, help='Renders per mode')
+
+  def handle(self, *args, **options):
+    # Unsaved recipes with ids: rendering needs no database rows
+    recipes = [
+      Recipe(id=i, name=f'Benchmark Recipe {i}', cooking_time=i % 90, ingredients='flour, sugar, eggs', difficulty=1, description='Benchmark')
+      for i in range(1, options['recipes'] + 1)
+    ]
+    request = RequestFactory().get('/recipes/')
+    request.user = AnonymousUser()
+    context = {'object_list': recipes, 'form': RecipeSearchForm(), 'display_name': 'Benchmark'}
+
+    def render():
+      start = time.perf_counter()
+      render_to_string('recipes/recipes_list.html', context, request=request)
+      return (time.perf_counter() - start) * 1000
+
+    cold = []
+    for _ in range(options['runs']):
+      # New content versions miss the cache without clearing it (it may be shared with the site)
+      for recipe in recipes:
+        recipe.content_version = uuid.uuid4()
+      cold.append(render())
+    warm = [render() for _ in range(options['runs'])]
+
+    self.stdout.write(json.dumps({
+      'recipes': options['recipes'],
+      'cache_backend': settings.CACHES['default']['BACKEND'],
+      'cold_median_ms': round(statistics.median(cold), 2),
+      'warm_median_ms': round(statistics.median(warm), 2),
+    }, indent=2))
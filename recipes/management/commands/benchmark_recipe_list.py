@@ -0,0 +1,86 @@
+"""
+Load test for the recipe list under concurrent requests.
+Serves GET /recipes/ through the WSGI handler from a pool of threads (like gunicorn's threaded workers)
+and reports p50/p99 latency with the database settings the project is configured with. Compare connection
+strategies by running it once per environment, e.g. against the same DATABASE_URL:
+
+    DB_CONN_MAX_AGE=0 manage.py benchmark_recipe_list > per_request.json
+    DB_CONN_MAX_AGE=600 manage.py benchmark_recipe_list > persistent.json
+    DATABASE_URL=<PgBouncer URL> DB_PGBOUNCER=1 manage.py benchmark_recipe_list > pgbouncer.json
+"""
+
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, RequestFactory
+from django.urls import reverse
+
+from recipes.models import Recipe
+
+class Command(BaseCommand):
+  help = 'Reports recipe_list p50/p99 latency under concurrent requests with the configured database connections.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--requests', type=int, default=500, help='Requests sent')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client threads')
+    parser.add_argument('--recipes', type=int, default=200, help='Recipes owned by the benchmark user')
+
+  def handle(self, *args, **options):
+    user = User.objects.create(username=f'benchmark-load-{time.time_ns()}')
+    try:
+      Recipe.objects.bulk_create([
+        Recipe(user=user, name=f'Load Test Recipe {i}', cooking_time=i % 90, ingredients='flour, sugar, eggs', difficulty=1, description='Load test')
+        for i in range(options['recipes'])
+      ])
+      client = Client()
+      client.force_login(user)
+      cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+      report = self.run_requests(cookie, options['requests'], options['concurrency'])
+    finally:
+      user.delete()
+
+    database = connections[DEFAULT_DB_ALIAS].settings_dict
+    self.stdout.write(json.dumps({
+      'vendor': connections[DEFAULT_DB_ALIAS].vendor,
+      'conn_max_age': database['CONN_MAX_AGE'],
+      'conn_health_checks': database['CONN_HEALTH_CHECKS'],
+      'server_side_cursors': not database.get('DISABLE_SERVER_SIDE_CURSORS', False),
+      'concurrency': options['concurrency'],
+      **report,
+    }, indent=2))
+
+  def run_requests(self, cookie, requests, concurrency):
+    """ Sends the requests from concurrency threads and returns latency percentiles in milliseconds. """
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    path = reverse('recipes:recipe_list')
+
+    def fetch(_):
+      environ = factory.get(path, HTTP_COOKIE=cookie, HTTP_HOST='localhost').environ
+      start = time.perf_counter()
+      response = handler(environ, lambda status, headers: None)
+      b''.join(response)
+      response.close() # Fires request_finished, which closes (or keeps) the connection
+      if response.status_code != 200:
+        raise RuntimeError(f'recipe_list returned {response.status_code}')
+      return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+      start = time.perf_counter()
+      latencies = list(executor.map(fetch, range(requests)))
+      elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+      'requests': requests,
+      'p50_ms': round(percentiles[49], 2),
+      'p99_ms': round(percentiles[98], 2),
+      'requests_per_second': round(requests / elapsed, 1),
+    }
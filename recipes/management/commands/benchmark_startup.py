@@ -0,0 +1,59 @@
+"""
+Benchmark for worker startup cost.
+Measures the import time and peak RSS of a fresh interpreter loading the WSGI application
+and the recipes views, with the charting stack loaded lazily (current) or eagerly (before).
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: loads what a gunicorn worker needs before serving the login page
+PROBE = '''
+import json, resource, sys, time
+start = time.perf_counter()
+if sys.argv[1] == 'eager':
+  import matplotlib.pyplot, pandas  # Module-level imports before the lazy facade
+from recipe_project.wsgi import application
+import recipes.urls
+elapsed = time.perf_counter() - start
+print(json.dumps({
+  'import_seconds': elapsed,
+  'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+  'pandas_loaded': 'pandas' in sys.modules,
+  'matplotlib_loaded': 'matplotlib' in sys.modules,
+}))
+'''
+
+class Command(BaseCommand):
+  help = 'Reports worker import time and peak RSS with lazy versus eager chart/table imports.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start per mode')
+
+  def handle(self, *args, **options):
+    report = {}
+    for mode in ('eager', 'lazy'):
+      samples = [self.probe(mode) for _ in range(options['runs'])]
+      report[mode] = {
+        'import_seconds_median': round(statistics.median(s['import_seconds'] for s in samples), 4),
+        'max_rss_mb_median': round(statistics.median(s['max_rss_mb'] for s in samples), 1),
+        'pandas_loaded': samples[0]['pandas_loaded'],
+        'matplotlib_loaded': samples[0]['matplotlib_loaded'],
+      }
+
+    self.stdout.write(json.dumps(report, indent=2))
+
+  def probe(self, mode):
+    """ Starts a fresh interpreter and returns its measurements. """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'recipe_project.settings')}
+    result = subprocess.run(
+      [sys.executable, '-c', PROBE, mode],
+      capture_output=True, text=True, check=True, env=env, cwd=settings.BASE_DIR
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,280 @@
+"""
+Reproducible benchmark for the recipe views and the chart engine.
+For each scale, seeds synthetic users and recipes (the same data for the same --seed), then measures
+- recipe_list for every search filter and chart selection, and recipe_chart for every filter and chart type,
+- RecipeDetailView, create_recipe_view (POST) and signup_view (POST),
+- get_chart called directly on a DataFrame of the benchmark user's recipes.
+Requests go through the whole middleware stack with the test client. Each scenario reports the first
+(cold cache) latency, p50/p90/p99/max of the following runs, database queries per run and peak Python
+memory (tracemalloc). After the first run, the recipe list, charts and recipe detail are served from the
+caches, so each of them has an "uncached" variant that bumps the version stamps (and drops the cached
+recipe) before every run, as a write by the user would. The output has no timestamps, so reports of two
+commits can be diffed directly:
+
+    manage.py benchmark_views --scales 1000 100000 > before.json
+
+Recipes are seeded in batches of SEED_BATCH_SIZE, each committed on its own like a bulk import would be,
+and deleted the same way once the scale is measured.
+"""
+
+import json
+import logging
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from recipes.cache import bump_recipes_version
+from recipes.middleware import get_percentiles
+from recipes.models import Ingredient, Recipe, invalidate_cached_recipe
+from recipes.utils import get_chart
+from recipes.views import recipes_to_dataframe
+
+# Search filters of the recipe list (every one matches some seeded recipes)
+FILTERS = {
+  'none': {},
+  'q': {'q': 'garlic'},
+  'recipe_name': {'recipe_name': 'soup'},
+  'ingredient': {'ingredient': 'garlic'},
+  'difficulty': {'difficulty': 'Easy'},
+}
+
+# Chart selections of the recipe list ('none': no chart)
+CHARTS = {'none': '', 'bar': '#1', 'pie': '#2', 'line': '#3'}
+
+# Vocabulary of the synthetic recipes
+ADJECTIVES = ('Spicy', 'Creamy', 'Roasted', 'Smoky', 'Quick', 'Classic', 'Lemony', 'Rustic', 'Herbed', 'Crispy')
+DISHES = ('Soup', 'Salad', 'Stew', 'Curry', 'Pasta', 'Risotto', 'Tart', 'Pie', 'Stir Fry', 'Casserole')
+INGREDIENTS = (
+  'garlic', 'onion', 'tomato', 'olive oil', 'butter', 'flour', 'sugar', 'eggs', 'milk', 'rice', 'chicken',
+  'beef', 'carrot', 'potato', 'lemon', 'basil', 'parsley', 'cheese', 'cream', 'pepper', 'salt', 'ginger',
+)
+
+# Recipes inserted (or deleted) per transaction while seeding (or cleaning up)
+SEED_BATCH_SIZE = 10000
+
+# Seeded recipes that are public (the rest are spread across the users)
+PUBLIC_SHARE = 0.1
+
+# Largest number of the benchmark user's recipes charted by get_chart
+CHART_ROWS = 10000
+
+# Password of the accounts created by the signup scenario
+SIGNUP_PASSWORD = 'benchmark-passphrase'
+
+# Username prefixes of the seeded users and of the users created by the signup scenario
+USER_PREFIX = 'benchmark-views-'
+SIGNUP_PREFIX = 'benchmark-signup-'
+
+class Command(BaseCommand):
+  help = 'Reports latency percentiles, queries and peak memory of the recipe views at several data scales (JSON).'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000], help='Recipes seeded for each run, e.g. 1000 100000 1000000')
+    parser.add_argument('--users', type=int, default=10, help='Users owning the seeded recipes')
+    parser.add_argument('--runs', type=int, default=20, help='Measured runs per scenario (after the first, cold one)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic data')
+
+  def handle(self, *args, **options):
+    if options['runs'] < 1 or options['users'] < 1:
+      raise CommandError('--runs and --users must be at least 1.')
+
+    # One JSON log line per request would drown the report
+    timing_logger = logging.getLogger('recipes.timing')
+    level = timing_logger.level
+    timing_logger.setLevel(logging.WARNING)
+    try:
+      results = []
+      for scale in options['scales']:
+        first_ingredient_pk = (Ingredient.objects.aggregate(last_pk=Max('pk'))['last_pk'] or 0) + 1
+        public_ids = [] # Filled by seed(), so a failed run can be cleaned up too
+        try:
+          results.append(self.run_scale(scale, options['users'], options['runs'], options['seed'], public_ids))
+        finally:
+          self.clean_up(public_ids, first_ingredient_pk)
+    finally:
+      timing_logger.setLevel(level)
+
+    self.stdout.write(json.dumps({
+      'vendor': connections[DEFAULT_DB_ALIAS].vendor,
+      'seed': options['seed'],
+      'runs': options['runs'],
+      'results': results,
+    }, indent=2))
+
+  def run_scale(self, scale, user_count, runs, seed, public_ids):
+    """ Seeds scale recipes (adding the ids of the public ones to public_ids) and measures every scenario. """
+    start = time.perf_counter()
+    users = self.seed(scale, user_count, random.Random(seed), public_ids)
+    seed_seconds = time.perf_counter() - start
+
+    user = users[0]
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(user)
+    recipe = Recipe.objects.filter(user=user).order_by('pk').first()
+
+    def invalidate():
+      """ Makes the next request miss the caches, as after a write by the user or to the public recipes. """
+      bump_recipes_version(user.pk)
+      bump_recipes_version(None)
+      invalidate_cached_recipe(recipe.pk)
+
+    # Scenario name: (run, cached); cached scenarios are measured a second time with invalidate() before every run
+    scenarios = {}
+    for filter_name, filters in FILTERS.items():
+      for chart_name, chart_type in CHARTS.items():
+        params = {**filters, 'chart_type': chart_type} if chart_type else filters
+        scenarios[f'recipe_list[{filter_name},{chart_name}]'] = (self.get(client, reverse('recipes:recipe_list'), params), True)
+    for filter_name, filters in FILTERS.items():
+      for chart_name, chart_type in CHARTS.items():
+        if chart_type:
+          scenarios[f'recipe_chart[{filter_name},{chart_name}]'] = (self.get(client, reverse('recipes:recipe_chart'), {**filters, 'chart_type': chart_type}), True)
+    scenarios['recipe_detail'] = (self.get(client, reverse('recipes:recipe_detail', args=[recipe.pk])), True)
+    scenarios['create_recipe'] = (self.create_recipe(client), False)
+    scenarios['signup'] = (self.signup(), False)
+
+    data = recipes_to_dataframe(Recipe.objects.filter(user=user).order_by('pk')[:CHART_ROWS])
+    for chart_name, chart_type in CHARTS.items():
+      if chart_type:
+        scenarios[f'get_chart[{chart_name}]'] = (lambda chart_type=chart_type: get_chart(chart_type, data), False)
+
+    results = {}
+    for name, (run, cached) in scenarios.items():
+      results[name] = self.measure(run, runs)
+      if cached:
+        results[f'{name.removesuffix("]")},uncached]' if name.endswith(']') else f'{name}[uncached]'] = self.measure(run, runs, before=invalidate)
+
+    return {
+      'scale': scale,
+      'users': user_count,
+      'seed_seconds': round(seed_seconds, 2),
+      'scenarios': results,
+    }
+
+  def seed(self, scale, user_count, rng, public_ids):
+    """
+    Creates user_count users and scale recipes (PUBLIC_SHARE of them public, their ids added to public_ids);
+    returns the users. Each batch of recipes is committed on its own, so no transaction spans the whole scale.
+    """
+    users = User.objects.bulk_create([User(username=f'{USER_PREFIX}{i}') for i in range(user_count)])
+    users = list(User.objects.filter(username__in=[user.username for user in users]).order_by('pk'))
+
+    public_count = int(scale * PUBLIC_SHARE)
+    batch = []
+    for i in range(scale):
+      batch.append(Recipe(
+        user=None if i < public_count else users[i % user_count],
+        name=f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} {i}',
+        cooking_time=rng.randint(1, 120),
+        ingredients=', '.join(rng.sample(INGREDIENTS, rng.randint(2, 8))),
+        description=f'Synthetic recipe with {rng.choice(INGREDIENTS)} and {rng.choice(INGREDIENTS)}.',
+      ))
+      if len(batch) >= SEED_BATCH_SIZE:
+        public_ids += [recipe.pk for recipe in Recipe.objects.bulk_create(batch) if recipe.user_id is None]
+        batch = []
+    if batch:
+      public_ids += [recipe.pk for recipe in Recipe.objects.bulk_create(batch) if recipe.user_id is None]
+
+    for user_id in [None] + [user.pk for user in users]:
+      bump_recipes_version(user_id)
+    return users
+
+  def clean_up(self, public_ids, first_ingredient_pk):
+    """
+    Deletes the seeded public recipes (public_ids) and the recipes of the benchmark users in batches of
+    SEED_BATCH_SIZE, then the benchmark users and the ingredients only they used.
+    Other recipes, including public ones created while the benchmark ran, are left alone.
+    """
+    # QuerySet.delete takes the recipes out of the stats rollup and bumps the version stamps
+    for start in range(0, len(public_ids), SEED_BATCH_SIZE):
+      Recipe.objects.filter(pk__in=public_ids[start:start + SEED_BATCH_SIZE]).delete()
+
+    owned = Recipe.objects.filter(user__username__startswith=USER_PREFIX).order_by('pk')
+    while True:
+      batch = list(owned.values_list('pk', flat=True)[:SEED_BATCH_SIZE])
+      if not batch:
+        break
+      owned.filter(pk__lte=batch[-1]).delete()
+
+    User.objects.filter(Q(username__startswith=USER_PREFIX) | Q(username__startswith=SIGNUP_PREFIX)).delete()
+    Ingredient.objects.filter(pk__gte=first_ingredient_pk, recipe_ingredients__isnull=True).delete()
+
+  def get(self, client, path, params=None):
+    """ Returns a scenario sending GET path?params, which must answer 200. """
+    def run():
+      response = client.get(path, params or {})
+      if response.status_code != 200:
+        raise CommandError(f'GET {path} {params or {}} returned {response.status_code}')
+    return run
+
+  def create_recipe(self, client):
+    """ Returns a scenario posting a new recipe to create_recipe_view. """
+    counter = iter(range(1_000_000_000))
+    def run():
+      name = f'Benchmark Created Recipe {next(counter)}'
+      response = client.post(reverse('recipes:create_recipe'), {
+        'name': name,
+        'cooking_time': 25,
+        'ingredients': 'flour, sugar, eggs, butter',
+        'description': 'Created by the benchmark',
+      })
+      if response.status_code != 200 or 'created successfully' not in response.content.decode():
+        raise CommandError(f'create_recipe_view did not create "{name}"')
+    return run
+
+  def signup(self):
+    """ Returns a scenario signing up a new user with signup_view (password hashing included). """
+    counter = iter(range(1_000_000_000))
+    def run():
+      username = f'{SIGNUP_PREFIX}{next(counter)}'
+      response = Client(HTTP_HOST='localhost').post(reverse('recipes:signup'), {
+        'username': username,
+        'password1': SIGNUP_PASSWORD,
+        'password2': SIGNUP_PASSWORD,
+      })
+      if response.status_code != 200 or 'successfully created' not in response.content.decode():
+        raise CommandError(f'signup_view did not create "{username}"')
+    return run
+
+  def measure(self, run, runs, before=None):
+    """
+    Times one cold run and runs more, then one more under tracemalloc for the peak memory.
+    before (if given) is called ahead of every run, outside of the measurements.
+    """
+    before = before or (lambda: None)
+    before()
+    start = time.perf_counter()
+    run()
+    first_ms = (time.perf_counter() - start) * 1000
+
+    latencies, queries = [], []
+    for _ in range(runs):
+      before()
+      with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as captured:
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+      queries.append(len(captured))
+
+    before()
+    tracemalloc.start()
+    try:
+      run()
+      peak = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+    return {
+      'first_ms': round(first_ms, 2),
+      'latency_ms': get_percentiles(latencies),
+      'queries': round(statistics.median(queries)),
+      'peak_memory_kib': round(peak / 1024),
+    }
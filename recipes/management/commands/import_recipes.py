@@ -0,0 +1,46 @@
+"""
+Imports recipes from a CSV or JSON Lines file (see recipes/bulk.py).
+Columns: name, cooking_time, ingredients and description (the format written by api/recipes/export/).
+"""
+
+import json
+import sys
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.bulk import FORMATS, get_format, import_recipes
+
+class Command(BaseCommand):
+  help = 'Imports recipes from a CSV or JSON Lines file, validated like the recipe form and inserted in batches.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('path', help='File to import ("-" for standard input, with --format)')
+    parser.add_argument('--user', help='Username owning the imported recipes (public recipes when omitted)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='', help='File format (default: from the file extension)')
+    parser.add_argument('--batch-size', type=int, default=settings.RECIPE_IMPORT_BATCH_SIZE, help='Recipes per bulk insert')
+
+  def handle(self, *args, **options):
+    user = None
+    if options['user']:
+      user = User.objects.filter(username=options['user']).first()
+      if user is None:
+        raise CommandError(f'User "{options["user"]}" does not exist.')
+    try:
+      file_format = get_format(options['path'], options['format'])
+    except ValueError as error:
+      raise CommandError(str(error))
+
+    if options['path'] == '-':
+      result = import_recipes(sys.stdin.buffer, file_format, user, options['batch_size'])
+    else:
+      try:
+        with open(options['path'], 'rb') as file:
+          result = import_recipes(file, file_format, user, options['batch_size'])
+      except OSError as error:
+        raise CommandError(str(error))
+
+    for invalid_row in result['errors']:
+      self.stderr.write(f'Line {invalid_row["line"]}: {json.dumps(invalid_row["errors"])}')
+    self.stdout.write(f'Imported {result["created"]} recipe(s), skipped {result["invalid"]} invalid row(s).')
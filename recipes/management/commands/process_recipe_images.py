@@ -0,0 +1,74 @@
+"""
+Background worker for recipe picture uploads.
+Processes the uploads staged by Recipe.save (resizing, metadata stripping and the storage upload) when the
+web processes don't run image threads (RECIPE_IMAGE_WORKERS = 0), and picks up uploads left pending by a
+restart. Must run on the machine holding RECIPE_IMAGE_STAGING_DIR.
+With --backfill, first generates the missing variants of pictures stored before variants existed.
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.images import process_recipe_image
+from recipes.models import PicStatus, Recipe
+
+logger = logging.getLogger('recipes.images')
+
+class Command(BaseCommand):
+  help = 'Processes staged recipe picture uploads, polling for new ones unless --once is given.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--once', action='store_true', help='Process the pending uploads and exit')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls for new uploads')
+    parser.add_argument(
+      '--retry', action='store_true',
+      help='First requeue failed uploads and uploads left processing by a stopped worker'
+    )
+    parser.add_argument(
+      '--backfill', action='store_true',
+      help='First generate the WebP/AVIF variants of stored pictures that have none'
+    )
+
+  def handle(self, *args, **options):
+    if options['retry']:
+      requeued = Recipe.objects.exclude(pic_staged='').filter(
+        pic_status__in=[PicStatus.PROCESSING, PicStatus.FAILED]
+      ).update(pic_status=PicStatus.PENDING)
+      self.stdout.write(f'Requeued {requeued} picture(s).')
+
+    if options['backfill']:
+      backfilled, failed = self.backfill()
+      self.stdout.write(f'Generated the variants of {backfilled} picture(s), {failed} failed.')
+
+    while True:
+      processed = self.process_pending()
+      if processed:
+        self.stdout.write(f'Processed {processed} picture(s).')
+      if options['once']:
+        break
+      time.sleep(options['interval'])
+
+  def process_pending(self):
+    """ Processes every pending upload and returns how many were stored. """
+    recipe_ids = Recipe.objects.exclude(pic_staged='').filter(
+      pic_status=PicStatus.PENDING
+    ).order_by('pk').values_list('pk', flat=True)
+    return sum(process_recipe_image(recipe_id) for recipe_id in list(recipe_ids))
+
+  def backfill(self):
+    """ Generates the variants of ready pictures without any; returns (pictures backfilled, pictures failed). """
+    default_pic = Recipe._meta.get_field('pic').default
+    recipes = Recipe.objects.filter(pic_status=PicStatus.READY, pic_variants={}).exclude(pic='').exclude(pic=default_pic)
+    backfilled = failed = 0
+    for recipe in recipes.only('id', 'pic', 'pic_status').order_by('pk').iterator():
+      try:
+        if recipe.backfill_pic_variants():
+          backfilled += 1
+        else:
+          failed += 1
+      except OSError:
+        logger.exception('Backfilling the picture variants of recipe %s failed', recipe.pk)
+        failed += 1
+    return backfilled, failed
@@ -0,0 +1,20 @@
+"""
+Reconciles the per-user recipe statistics rollup (RecipeStats) with the recipe tables.
+Needed after writes that bypass Recipe.save/delete, such as QuerySet.update() or raw SQL.
+"""
+
+from django.core.management.base import BaseCommand
+
+from recipes.cache import bump_recipes_version
+from recipes.models import RecipeStats
+
+class Command(BaseCommand):
+  help = 'Recomputes the per-user recipe statistics and fixes any rows that drifted.'
+
+  def handle(self, *args, **options):
+    fixed = RecipeStats.objects.rebuild()
+    if fixed:
+      # Cached charts may have been drawn from the drifted rows
+      for user_id in RecipeStats.objects.values_list('user_id', flat=True):
+        bump_recipes_version(user_id)
+    self.stdout.write(f'Recipe stats rebuilt: {fixed} row(s) fixed.')
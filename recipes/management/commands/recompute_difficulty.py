@@ -0,0 +1,28 @@
+"""
+Recomputes every stored recipe difficulty in bulk (see RecipeQuerySet.recompute_difficulty).
+Run after changing the difficulty rules (DIFFICULTY_RULES and its thresholds in recipes/models.py),
+instead of re-saving every recipe. The recipe statistics are rebuilt afterwards.
+"""
+
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+
+class Command(BaseCommand):
+  help = 'Recomputes recipe difficulties in vectorized batches and updates the rows that changed.'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=10000, help='Recipes read and updated per batch')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many recipes would change')
+
+  def handle(self, *args, **options):
+    start = time.perf_counter()
+    checked, changed = Recipe.objects.recompute_difficulty(options['batch_size'], dry_run=options['dry_run'])
+    seconds = time.perf_counter() - start
+    verb = 'would change' if options['dry_run'] else 'changed'
+    self.stdout.write(f'Recomputed difficulty for {checked} recipe(s) in {seconds:.1f}s: {changed} {verb}.')
+    if changed and not options['dry_run']:
+      call_command('rebuild_recipe_stats', stdout=self.stdout)
@@ -0,0 +1,113 @@
+"""
+Request-level performance instrumentation.
+RequestTimingMiddleware measures every request: wall time, database queries and their time
+and named spans around the expensive steps (see recipes/timing.py), such as the chart rendering,
+the DataFrame table and the template rendering. It reports them
+- in a Server-Timing header (shown by the browser's developer tools) when REQUEST_TIMING_HEADER is on
+  (by default only with DEBUG: the header exposes query counts and timings to every client),
+- as one JSON log line per request on the 'recipes.timing' logger, at INFO (off unless that level is enabled),
+- as rolling per-view percentiles at /_timings/ (REQUEST_TIMING_STATS, local requests only).
+"""
+
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from time import perf_counter
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+
+from .timing import measure_request
+
+logger = logging.getLogger('recipes.timing')
+
+# Addresses allowed to read the /_timings/ endpoint (besides settings.INTERNAL_IPS)
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+class TimingStats:
+  """ Rolling window of the last total and database times (milliseconds) of each view, for this process. """
+
+  def __init__(self, window=1000):
+    self.window = window
+    self._samples = defaultdict(lambda: deque(maxlen=self.window))
+    self._lock = threading.Lock()
+
+  def add(self, view, total_ms, db_ms):
+    with self._lock:
+      self._samples[view].append((total_ms, db_ms))
+
+  def clear(self):
+    with self._lock:
+      self._samples.clear()
+
+  def summary(self):
+    """ Returns {view: {'count', 'total_ms': percentiles, 'db_ms': percentiles}}. """
+    with self._lock:
+      samples = {view: list(values) for view, values in self._samples.items()}
+    return {
+      view: {
+        'count': len(values),
+        'total_ms': get_percentiles([total for total, _ in values]),
+        'db_ms': get_percentiles([db for _, db in values]),
+      }
+      for view, values in sorted(samples.items())
+    }
+
+def get_percentiles(values):
+  """ Returns the p50, p90, p99 and max of values (nearest-rank). """
+  ordered = sorted(values)
+  def rank(fraction):
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+  return {'p50': rank(0.5), 'p90': rank(0.9), 'p99': rank(0.99), 'max': round(ordered[-1], 2)}
+
+timing_stats = TimingStats()
+
+class RequestTimingMiddleware:
+  """
+  Times each request (see the module docstring). Keep it first in MIDDLEWARE so the total
+  includes the other middleware.
+  """
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+
+  def __call__(self, request):
+    start = perf_counter()
+    with measure_request() as timings:
+      response = self.get_response(request)
+    total_seconds = perf_counter() - start
+
+    view = request.resolver_match.view_name if request.resolver_match else None
+    if settings.REQUEST_TIMING_HEADER:
+      response['Server-Timing'] = format_server_timing(timings, total_seconds)
+    if logger.isEnabledFor(logging.INFO):
+      logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'view': view,
+        'status': response.status_code,
+        'total_ms': round(total_seconds * 1000, 2),
+        'db_ms': round(timings.db_seconds * 1000, 2),
+        'db_queries': timings.db_queries,
+        'spans_ms': {name: round(seconds * 1000, 2) for name, seconds in timings.spans.items()},
+      }))
+    if settings.REQUEST_TIMING_STATS and view:
+      timing_stats.add(view, total_seconds * 1000, timings.db_seconds * 1000)
+    return response
+
+def format_server_timing(timings, total_seconds):
+  """ Formats the measurements as a Server-Timing header value (durations in milliseconds). """
+  metrics = [
+    f'total;dur={total_seconds * 1000:.2f}',
+    f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.db_queries} queries"',
+  ]
+  metrics += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.spans.items()]
+  return ', '.join(metrics)
+
+def timing_stats_view(request):
+  """ Rolling per-view percentiles of this process (only when REQUEST_TIMING_STATS is on, for local requests). """
+  remote_addr = request.META.get('REMOTE_ADDR')
+  if not settings.REQUEST_TIMING_STATS or (remote_addr not in LOCAL_ADDRESSES and remote_addr not in settings.INTERNAL_IPS):
+    raise Http404('Not found.')
+  return JsonResponse({'window': timing_stats.window, 'views': timing_stats.summary()})
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+# Frozen copies of recipes.models.parse_ingredients and normalize_ingredient as of this migration
+
+def parse_ingredients(ingredients):
+    """Split a comma-separated ingredient string into a list of stripped names."""
+    if ingredients:
+        return [ingredient.strip() for ingredient in ingredients.split(',')]
+    return []
+
+
+def normalize_ingredient(name):
+    """Normalize an ingredient name (collapsed whitespace, lowercase)."""
+    return ' '.join(name.split()).lower()
+
+
+def populate_ingredients(apps, schema_editor):
+    """Parse each recipe's comma-separated ingredients into the normalized ingredient table."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+
+    names_by_recipe = {
+        recipe_id: {normalize_ingredient(name) for name in parse_ingredients(ingredients) if name.strip()}
+        for recipe_id, ingredients in Recipe.objects.values_list('id', 'ingredients').iterator()
+    }
+    all_names = set().union(*names_by_recipe.values())
+
+    Ingredient.objects.bulk_create([Ingredient(name=name) for name in all_names], ignore_conflicts=True)
+    ingredient_ids = dict(Ingredient.objects.values_list('name', 'id'))
+
+    RecipeIngredient.objects.bulk_create(
+        [
+            RecipeIngredient(recipe_id=recipe_id, ingredient_id=ingredient_ids[name])
+            for recipe_id, names in names_by_recipe.items()
+            for name in names
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def clear_ingredients(apps, schema_editor):
+    apps.get_model('recipes', 'RecipeIngredient').objects.all().delete()
+    apps.get_model('recipes', 'Ingredient').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_ingredient'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_ingredients, clear_ingredients),
+    ]
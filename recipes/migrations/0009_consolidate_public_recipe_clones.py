@@ -0,0 +1,83 @@
+from django.db import migrations
+
+
+# A user's recipe is a clone of a public recipe when all of these match (the clones copied them verbatim)
+CLONE_FIELDS = ('name', 'cooking_time', 'ingredients', 'description')
+
+
+def consolidate_clones(apps, schema_editor):
+    """
+    Replace per-user clones of public recipes with copy-on-write records.
+
+    Clones were made by copying recipes verbatim: the public recipes (user=None) when a user's list was
+    empty, or the recipes of the site owner's account at signup. A user's recipe is matched to a public
+    recipe on CLONE_FIELDS; public recipes sharing a name are ambiguous and their clones are left alone.
+
+    - Clones that also kept the picture are deleted: the user now sees the shared public recipe directly.
+    - Clones with a different picture are kept as private copies of the public recipe, which is hidden
+      from that user.
+    - Users who had clones, but deleted some of them, keep those public recipes hidden.
+    - Every other recipe (including one that only shares its name with a public recipe) is left untouched.
+    """
+    Recipe = apps.get_model('recipes', 'Recipe')
+    HiddenRecipe = apps.get_model('recipes', 'HiddenRecipe')
+
+    public_recipes = list(Recipe.objects.filter(user__isnull=True).values('id', 'pic', *CLONE_FIELDS))
+    if not public_recipes:
+        return
+
+    names = {}
+    for recipe in public_recipes:
+        names.setdefault(recipe['name'], []).append(recipe)
+    public_by_content = {
+        tuple(recipes[0][field] for field in CLONE_FIELDS): recipes[0]
+        for recipes in names.values()
+        if len(recipes) == 1
+    }
+    public_names = [content[0] for content in public_by_content]
+    public_ids = [recipe['id'] for recipe in public_by_content.values()]
+
+    user_ids = (
+        Recipe.objects.filter(user__isnull=False, name__in=public_names)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+
+    for user_id in user_ids:
+        cloned_public_ids = set()
+        deleted_ids = []
+        copies = []
+
+        for recipe in Recipe.objects.filter(user_id=user_id, name__in=public_names).values('id', 'pic', *CLONE_FIELDS):
+            public = public_by_content.get(tuple(recipe[field] for field in CLONE_FIELDS))
+            if public is None or public['id'] in cloned_public_ids:
+                continue # Not a clone (or a second clone of the same recipe, which the user made themselves)
+            cloned_public_ids.add(public['id'])
+            if recipe['pic'] == public['pic']:
+                deleted_ids.append(recipe['id'])
+            else:
+                copies.append(Recipe(id=recipe['id'], source_id=public['id']))
+
+        if not cloned_public_ids:
+            continue
+
+        Recipe.objects.filter(pk__in=deleted_ids).delete()
+        Recipe.objects.bulk_update(copies, ['source'])
+
+        # Public recipes the user had no clone of anymore were deleted (or edited beyond recognition) by the user
+        HiddenRecipe.objects.bulk_create(
+            [HiddenRecipe(user_id=user_id, recipe_id=copy.source_id) for copy in copies]
+            + [HiddenRecipe(user_id=user_id, recipe_id=public_id) for public_id in public_ids if public_id not in cloned_public_ids],
+            ignore_conflicts=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_hiddenrecipe_recipe_source'),
+    ]
+
+    operations = [
+        migrations.RunPython(consolidate_clones, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+# Frozen copy of the search index DDL as of this migration (see recipes.search)
+POSTGRES_INSTALL = [
+    "ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(ingredients, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+    ") STORED",
+    'CREATE INDEX recipes_recipe_search_idx ON recipes_recipe USING gin (search_vector)',
+]
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS recipes_recipe_search_idx',
+    'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector',
+]
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE recipes_recipe_fts USING fts5(name, ingredients, description, tokenize='porter unicode61')",
+    'INSERT INTO recipes_recipe_fts(rowid, name, ingredients, description) '
+    'SELECT id, name, ingredients, description FROM recipes_recipe',
+]
+SQLITE_UNINSTALL = [
+    'DROP TABLE IF EXISTS recipes_recipe_fts',
+]
+
+
+def run_statements(schema_editor, statements):
+    """Run the statements for the database in use (other databases have no search index)."""
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def install_search_index(apps, schema_editor):
+    """Create the full-text search index for the database in use (tsvector + GIN or FTS5)."""
+    run_statements(schema_editor, {'postgresql': POSTGRES_INSTALL, 'sqlite': SQLITE_INSTALL})
+
+
+def uninstall_search_index(apps, schema_editor):
+    run_statements(schema_editor, {'postgresql': POSTGRES_UNINSTALL, 'sqlite': SQLITE_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_consolidate_public_recipe_clones'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations, models
+
+
+# Frozen copies of recipes.models.Difficulty, its rules (Recipe.calculate_difficulty) and recipes.utils.TIME_BINS
+# as of this migration: the stored values must keep the meaning they had here, whatever the live code becomes.
+DIFFICULTY_CHOICES = [(1, 'Easy'), (2, 'Medium'), (3, 'Intermediate'), (4, 'Hard')]
+QUICK_COOKING_TIME = 10
+FEW_INGREDIENTS = 4
+DIFFICULTY_RULES = {
+    # (quick, few ingredients): difficulty
+    (True, True): 1,
+    (True, False): 2,
+    (False, True): 3,
+    (False, False): 4,
+}
+TIME_BINS = [0, 10, 30, 60, float('inf')]
+
+
+def difficulty_labels_to_values(apps, schema_editor):
+    """Replace the stored difficulty labels with their enum values (cast to integers by the next operation)."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    for value, label in DIFFICULTY_CHOICES:
+        Recipe.objects.filter(difficulty=label).update(difficulty=str(value))
+
+    # Recalculate any row without a recognized label, then store each difficulty with one update
+    known = [str(value) for value, _ in DIFFICULTY_CHOICES]
+    ids_by_difficulty = {}
+    for recipe_id, cooking_time, ingredients in Recipe.objects.exclude(difficulty__in=known).values_list('id', 'cooking_time', 'ingredients'):
+        ingredient_count = ingredients.count(',') + 1 if ingredients else 0
+        difficulty = DIFFICULTY_RULES[(cooking_time < QUICK_COOKING_TIME, ingredient_count < FEW_INGREDIENTS)]
+        ids_by_difficulty.setdefault(difficulty, []).append(recipe_id)
+    for difficulty, recipe_ids in ids_by_difficulty.items():
+        for start in range(0, len(recipe_ids), 1000): # Stay under the database's query parameter limit
+            Recipe.objects.filter(pk__in=recipe_ids[start:start + 1000]).update(difficulty=str(difficulty))
+
+
+def difficulty_values_to_labels(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    for value, label in DIFFICULTY_CHOICES:
+        Recipe.objects.filter(difficulty=str(value)).update(difficulty=label)
+
+
+def populate_time_buckets(apps, schema_editor):
+    """Fill in the cooking-time bucket of existing recipes with one update per bucket."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    for bucket, (lower, upper) in enumerate(zip(TIME_BINS, TIME_BINS[1:]), start=1):
+        recipes = Recipe.objects.filter(cooking_time__gte=lower)
+        if upper != float('inf'):
+            recipes = recipes.filter(cooking_time__lt=upper)
+        recipes.update(time_bucket=bucket)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(difficulty_labels_to_values, difficulty_values_to_labels),
+        migrations.AlterField(
+            model_name='recipe',
+            name='difficulty',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Easy'), (2, 'Medium'), (3, 'Intermediate'), (4, 'Hard')], editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='time_bucket',
+            field=models.PositiveSmallIntegerField(choices=[(1, '0-10 mins'), (2, '11-30 mins'), (3, '31-60 mins'), (4, '60+ mins')], editable=False, null=True),
+        ),
+        migrations.RunPython(populate_time_buckets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'difficulty'], name='recipe_user_difficulty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', 'time_bucket'], name='recipe_user_time_bucket_idx'),
+        ),
+    ]
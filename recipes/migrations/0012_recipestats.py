@@ -0,0 +1,102 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:30
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+# Frozen copy of recipes.models.compute_recipe_stats (and its helpers) as of this migration:
+# the rollup must be computed the way the RecipeStats rows were defined here, whatever the live code becomes.
+
+def get_stats_entry(difficulty, time_bucket, ingredients):
+    """Return (difficulty, time bucket, normalized ingredient names) for one recipe."""
+    names = ingredients.split(',') if ingredients else []
+    names = sorted({' '.join(name.split()).lower() for name in names if name.strip()})
+    return (difficulty, time_bucket, names)
+
+
+def compute_recipe_stats(recipes, hidden):
+    """
+    Return {owner id (None for public recipes): (difficulty_counts, time_bucket_counts, ingredient_counts)}
+    from (id, user_id, difficulty, time_bucket, ingredients) recipe rows and (user_id, recipe_id) hidden rows.
+    Public recipes a user has hidden are subtracted from that user's row.
+    """
+    stats = {}
+    public_entries = {}
+
+    def add(owner_id, entry, sign):
+        counts = stats.setdefault(owner_id, (Counter(), Counter(), Counter()))
+        difficulty, time_bucket, names = entry
+        counts[0][str(difficulty)] += sign
+        if time_bucket is not None:
+            counts[1][str(time_bucket)] += sign
+        for name in names:
+            counts[2][name] += sign
+
+    for recipe_id, user_id, difficulty, time_bucket, ingredients in recipes:
+        entry = get_stats_entry(difficulty, time_bucket, ingredients)
+        add(user_id, entry, 1)
+        if user_id is None:
+            public_entries[recipe_id] = entry
+
+    for user_id, recipe_id in hidden:
+        if recipe_id in public_entries:
+            add(user_id, public_entries[recipe_id], -1)
+
+    return {
+        owner_id: tuple({key: count for key, count in counter.items() if count} for counter in counts)
+        for owner_id, counts in stats.items()
+    }
+
+
+def populate_recipe_stats(apps, schema_editor):
+    """Compute the statistics rollup of every recipe owner from the existing recipes."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    HiddenRecipe = apps.get_model('recipes', 'HiddenRecipe')
+    RecipeStats = apps.get_model('recipes', 'RecipeStats')
+
+    stats = compute_recipe_stats(
+        Recipe.objects.values_list('id', 'user_id', 'difficulty', 'time_bucket', 'ingredients').iterator(),
+        HiddenRecipe.objects.values_list('user_id', 'recipe_id').iterator(),
+    )
+    RecipeStats.objects.bulk_create(
+        [
+            RecipeStats(
+                user_id=owner_id,
+                difficulty_counts=counts[0],
+                time_bucket_counts=counts[1],
+                ingredient_counts=counts[2],
+            )
+            for owner_id, counts in stats.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0011_recipe_difficulty_time_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty_counts', models.JSONField(default=dict)),
+                ('time_bucket_counts', models.JSONField(default=dict)),
+                ('ingredient_counts', models.JSONField(default=dict)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recipe_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='recipestats',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('user', models.Value(0)), name='unique_recipe_stats_owner'),
+        ),
+        migrations.RunPython(populate_recipe_stats, migrations.RunPython.noop),
+    ]
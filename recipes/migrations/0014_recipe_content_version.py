@@ -0,0 +1,38 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:38
+
+from django.db import migrations, models
+import uuid
+
+
+def populate_content_versions(apps, schema_editor):
+    """Give every existing recipe its own content version (an AddField default is evaluated only once)."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    batch = []
+    for recipe in Recipe.objects.filter(content_version__isnull=True).only('id').iterator(chunk_size=1000):
+        recipe.content_version = uuid.uuid4()
+        batch.append(recipe)
+        if len(batch) >= 1000:
+            Recipe.objects.bulk_update(batch, ['content_version'])
+            batch = []
+    Recipe.objects.bulk_update(batch, ['content_version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='content_version',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_content_versions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='recipe',
+            name='content_version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
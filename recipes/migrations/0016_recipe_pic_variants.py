@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='pic_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+# Frozen copy of the SQLite FTS5 table and its triggers (recipes.search.SQLiteSearchBackend)
+FTS_TABLE = 'recipes_recipe_fts'
+
+TRIGGERS = {
+    'recipes_recipe_fts_insert': (
+        'AFTER INSERT ON recipes_recipe BEGIN '
+        'INSERT INTO recipes_recipe_fts(rowid, name, ingredients, description) '
+        'VALUES (new.id, new.name, new.ingredients, new.description); END'
+    ),
+    'recipes_recipe_fts_update': (
+        'AFTER UPDATE OF id, name, ingredients, description ON recipes_recipe BEGIN '
+        'DELETE FROM recipes_recipe_fts WHERE rowid = old.id; '
+        'INSERT INTO recipes_recipe_fts(rowid, name, ingredients, description) '
+        'VALUES (new.id, new.name, new.ingredients, new.description); END'
+    ),
+    'recipes_recipe_fts_delete': (
+        'AFTER DELETE ON recipes_recipe BEGIN DELETE FROM recipes_recipe_fts WHERE rowid = old.id; END'
+    ),
+}
+
+
+def install_triggers(apps, schema_editor):
+    """
+    Keep the SQLite search index in sync with recipes_recipe using triggers, then rebuild it to drop the
+    rows orphaned by cascades and QuerySet.update/delete. PostgreSQL's generated tsvector column already
+    follows the table.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, body in TRIGGERS.items():
+        schema_editor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+    schema_editor.execute(f'DELETE FROM {FTS_TABLE}')
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE}(rowid, name, ingredients, description) '
+        'SELECT id, name, ingredients, description FROM recipes_recipe'
+    )
+
+
+def uninstall_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_recipe_pic_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_triggers, uninstall_triggers),
+    ]
@@ -1,6 +1,406 @@
-from django.db import models
+import os
+import uuid
+from bisect import bisect_right
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 from django.shortcuts import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
+from .cache import bump_recipes_version, hidden_recipes_cache_key, recipe_cache_key
+from .images import enqueue_recipe_image, generate_variants, get_staging_storage, strip_metadata
+from .utils import TIME_BINS, TIME_LABELS
+
+def parse_ingredients(ingredients):
+  """
+  Splits a comma-separated ingredient string into a list of stripped names.
+  Returns an empty list if no ingredients are provided.
+  """
+  if ingredients:
+    return [ingredient.strip() for ingredient in ingredients.split(',')]
+  return []
+
+def normalize_ingredient(name):
+  """
+  Normalizes an ingredient name for storage and lookups (collapsed whitespace, lowercase).
+  """
+  return ' '.join(name.split()).lower()
+
+def sync_recipe_ingredients(recipes):
+  """
+  Rebuilds the normalized ingredient rows for the given (saved) recipes.
+  Uses a constant number of queries regardless of how many recipes are passed in.
+  """
+  recipes = [recipe for recipe in recipes if recipe.pk is not None]
+  if not recipes:
+    return
+
+  names_by_recipe = {
+    recipe.pk: {normalize_ingredient(name) for name in recipe.return_ingredients_as_list() if name.strip()}
+    for recipe in recipes
+  }
+  all_names = set().union(*names_by_recipe.values())
+
+  # Create any ingredient that does not exist yet, then look up all of their ids
+  Ingredient.objects.bulk_create([Ingredient(name=name) for name in all_names], ignore_conflicts=True)
+  ingredient_ids = dict(Ingredient.objects.filter(name__in=all_names).values_list('name', 'id'))
+
+  RecipeIngredient.objects.filter(recipe_id__in=names_by_recipe.keys()).delete()
+  RecipeIngredient.objects.bulk_create([
+    RecipeIngredient(recipe_id=recipe_id, ingredient_id=ingredient_ids[name])
+    for recipe_id, names in names_by_recipe.items()
+    for name in names
+  ])
+
+def get_stats_entry(difficulty, time_bucket, ingredients):
+  """
+  Returns what one recipe contributes to its owner's RecipeStats:
+  (difficulty, time bucket, normalized ingredient names).
+  """
+  names = sorted({normalize_ingredient(name) for name in parse_ingredients(ingredients) if name.strip()})
+  return (difficulty, time_bucket, names)
+
+def add_stats_entry(counts, entry, sign=1):
+  """
+  Adds (sign=1) or subtracts (sign=-1) a recipe stats entry to (difficulty, time bucket, ingredient) Counters.
+  Keys are strings, as stored in the RecipeStats JSON fields.
+  """
+  difficulty, time_bucket, names = entry
+  counts[0][str(difficulty)] += sign
+  if time_bucket is not None:
+    counts[1][str(time_bucket)] += sign
+  for name in names:
+    counts[2][name] += sign
+
+def compact_stats_counts(counts):
+  """
+  Returns (difficulty, time bucket, ingredient) Counters as plain dicts without zero counts.
+  """
+  return tuple({key: count for key, count in counter.items() if count} for counter in counts)
+
+def compute_recipe_stats(recipes, hidden):
+  """
+  Computes RecipeStats counts from scratch.
+  Args:
+  - recipes: (id, user_id, difficulty, time_bucket, ingredients) rows of every recipe.
+  - hidden: (user_id, recipe_id) rows of every hidden public recipe.
+  Returns: {owner id (None for public recipes): (difficulty_counts, time_bucket_counts, ingredient_counts)}.
+  """
+  stats = {}
+  public_entries = {}
+
+  def add(owner_id, entry, sign):
+    add_stats_entry(stats.setdefault(owner_id, (Counter(), Counter(), Counter())), entry, sign)
+
+  for recipe_id, user_id, difficulty, time_bucket, ingredients in recipes:
+    entry = get_stats_entry(difficulty, time_bucket, ingredients)
+    add(user_id, entry, 1)
+    if user_id is None:
+      public_entries[recipe_id] = entry
+
+  # Public recipes a user has hidden are subtracted from that user's row
+  for user_id, recipe_id in hidden:
+    if recipe_id in public_entries:
+      add(user_id, public_entries[recipe_id], -1)
+
+  return {owner_id: compact_stats_counts(counts) for owner_id, counts in stats.items()}
+
+def update_recipe_stats(owner_id, recipe_id=None, old=None, new=None):
+  """
+  Replaces a recipe's old stats entry with its new one (either may be None) in its owner's RecipeStats.
+  Users who hid a public recipe have it subtracted from their own row, so they get the opposite change.
+  """
+  RecipeStats.objects.apply(owner_id, added=[new] if new else [], removed=[old] if old else [])
+  if owner_id is None and recipe_id is not None:
+    for user_id in HiddenRecipe.objects.filter(recipe_id=recipe_id).values_list('user_id', flat=True):
+      RecipeStats.objects.apply(user_id, added=[old] if old else [], removed=[new] if new else [])
+
+def invalidate_cached_recipe(recipe_id):
+  """
+  Drops a recipe from the object cache, now and again once the current transaction commits
+  (so a concurrent request can't cache the old row in between).
+  """
+  key = recipe_cache_key(recipe_id)
+  cache.delete(key)
+  transaction.on_commit(lambda: cache.delete(key))
+
+def get_hidden_recipe_ids(user):
+  """
+  Returns the set of public recipe ids the user has hidden, cached until the user's next write.
+  """
+  key = hidden_recipes_cache_key(user.pk)
+  hidden = cache.get(key)
+  if hidden is None:
+    hidden = set(HiddenRecipe.objects.filter(user=user).values_list('recipe_id', flat=True))
+    cache.set(key, hidden, settings.RECIPE_CACHE_TIMEOUT)
+  return hidden
+
+class Difficulty(models.IntegerChoices):
+  """
+  Recipe difficulty levels, stored as small integers in chart order.
+  """
+  EASY = 1, 'Easy'
+  MEDIUM = 2, 'Medium'
+  INTERMEDIATE = 3, 'Intermediate'
+  HARD = 4, 'Hard'
+
+# Difficulty rules shared by Recipe.calculate_difficulty and calculate_difficulties (so they can't drift):
+# a recipe is quick below QUICK_COOKING_TIME minutes and simple below FEW_INGREDIENTS ingredients
+QUICK_COOKING_TIME = 10
+FEW_INGREDIENTS = 4
+
+# Difficulty by (quick, simple)
+DIFFICULTY_RULES = {
+  (True, True): Difficulty.EASY,
+  (True, False): Difficulty.MEDIUM,
+  (False, True): Difficulty.INTERMEDIATE,
+  (False, False): Difficulty.HARD,
+}
+
+def get_difficulty(cooking_time, ingredient_count):
+  """
+  Returns the Difficulty of a recipe from its cooking time (minutes) and number of ingredients.
+  """
+  return DIFFICULTY_RULES[(cooking_time < QUICK_COOKING_TIME, ingredient_count < FEW_INGREDIENTS)]
+
+def count_ingredients(ingredients):
+  """
+  Returns the number of ingredients in a comma-separated string (len(parse_ingredients()), without the list).
+  """
+  return ingredients.count(',') + 1 if ingredients else 0
+
+def calculate_difficulties(cooking_times, ingredient_counts):
+  """
+  Batch version of get_difficulty: returns the Difficulty values (a NumPy integer array) for arrays
+  of cooking times and ingredient counts, computed in one vectorized pass over DIFFICULTY_RULES.
+  """
+  import numpy
+
+  # rules[quick, simple] holds the difficulty value of each combination
+  rules = numpy.zeros((2, 2), dtype=numpy.int16)
+  for (quick, simple), difficulty in DIFFICULTY_RULES.items():
+    rules[int(quick), int(simple)] = difficulty
+  quick = numpy.asarray(cooking_times) < QUICK_COOKING_TIME
+  simple = numpy.asarray(ingredient_counts) < FEW_INGREDIENTS
+  return rules[quick.astype(numpy.intp), simple.astype(numpy.intp)]
+
+class PicStatus(models.IntegerChoices):
+  """
+  Processing state of a recipe picture upload (see Recipe.stage_pic and Recipe.process_staged_pic).
+  """
+  READY = 1, 'Ready'
+  PENDING = 2, 'Pending'
+  PROCESSING = 3, 'Processing'
+  FAILED = 4, 'Failed'
+
+# Cooking-time buckets (1-based, in chart order) and their labels
+TIME_BUCKET_CHOICES = list(enumerate(TIME_LABELS, start=1))
+
+def get_time_bucket(cooking_time):
+  """
+  Returns the cooking-time bucket for a number of minutes, using the [lower, upper) bins of the charts.
+  Returns None for missing or negative cooking times (they are left out of the charts).
+  """
+  if cooking_time is None or cooking_time < TIME_BINS[0]:
+    return None
+  return bisect_right(TIME_BINS, cooking_time)
+
+class RecipeQuerySet(models.QuerySet):
+  """
+  QuerySet for recipes that keeps the normalized ingredient table in sync on bulk inserts.
+  """
+
+  def bulk_create(self, objs, *args, **kwargs):
+    """
+    Inserts recipes in bulk with their cooking-time buckets, and creates their ingredient rows
+    (bulk_create bypasses Recipe.save).
+    Recipes without a difficulty get one, computed for all of them in one vectorized pass.
+    """
+    objs = list(objs)
+    missing = [recipe for recipe in objs if recipe.difficulty is None]
+    if missing:
+      difficulties = calculate_difficulties(
+        [recipe.cooking_time for recipe in missing],
+        [count_ingredients(recipe.ingredients) for recipe in missing]
+      )
+      for recipe, difficulty in zip(missing, difficulties.tolist()):
+        recipe.difficulty = difficulty
+    for recipe in objs:
+      recipe.time_bucket = get_time_bucket(recipe.cooking_time)
+    objs = super().bulk_create(objs, *args, **kwargs)
+    sync_recipe_ingredients(objs)
+    cache.delete_many([recipe_cache_key(recipe.pk) for recipe in objs if recipe.pk is not None])
+
+    entries_by_owner = {}
+    for recipe in objs:
+      entries_by_owner.setdefault(recipe.user_id, []).append(recipe.get_stats_entry())
+    for owner_id, entries in entries_by_owner.items():
+      RecipeStats.objects.apply(owner_id, added=entries)
+    return objs
+
+  def delete(self):
+    """
+    Deletes the recipes with the bookkeeping Recipe.delete does for each one (QuerySet.delete, used by the
+    admin's bulk delete, bypasses it): takes them out of the stats rollup, drops them from the object cache
+    and bumps the version stamps of their owners.
+    """
+    with transaction.atomic():
+      recipe_ids, removed, public = [], {}, {}
+      for pk, user_id, *fields in self.values_list('pk', 'user_id', 'difficulty', 'time_bucket', 'ingredients'):
+        entry = get_stats_entry(*fields)
+        recipe_ids.append(pk)
+        removed.setdefault(user_id, []).append(entry)
+        if user_id is None:
+          public[pk] = entry
+      for owner_id, entries in removed.items():
+        RecipeStats.objects.apply(owner_id, removed=entries)
+      # Users who hid a public recipe had it subtracted from their own row already
+      restored = {}
+      for user_id, recipe_id in HiddenRecipe.objects.filter(recipe_id__in=list(public)).values_list('user_id', 'recipe_id'):
+        restored.setdefault(user_id, []).append(public[recipe_id])
+      for user_id, entries in restored.items():
+        RecipeStats.objects.apply(user_id, added=entries)
+      result = super().delete()
+
+    # Like invalidate_cached_recipe, again once the transaction commits
+    keys = [recipe_cache_key(pk) for pk in recipe_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    for owner_id in removed:
+      bump_recipes_version(owner_id)
+    return result
+
+  def visible_to(self, user):
+    """
+    Returns the recipes a user can see: their own plus the shared public recipes (user=None),
+    minus any public recipe they have hidden (deleted, or replaced by a private copy).
+    """
+    hidden = HiddenRecipe.objects.filter(user=user).values('recipe_id')
+    return self.filter(Q(user=user) | Q(user__isnull=True)).exclude(pk__in=hidden)
+
+  def get_cached(self, pk):
+    """
+    Returns the recipe with pk from the object cache, loading it from the database on a miss.
+    Returns None if there is no such recipe. Entries are dropped by Recipe.save/delete.
+    """
+    key = recipe_cache_key(pk)
+    recipe = cache.get(key)
+    if recipe is None:
+      recipe = self.filter(pk=pk).first()
+      if recipe is not None:
+        cache.set(key, recipe, settings.RECIPE_CACHE_TIMEOUT)
+    return recipe
+
+  def recompute_difficulty(self, batch_size=10000, dry_run=False):
+    """
+    Recomputes the stored difficulties (e.g. after a change to DIFFICULTY_RULES) without Recipe.save:
+    reads batch_size recipes at a time (keyset on id), computes their difficulties in one vectorized pass
+    and updates the changed rows with one UPDATE per difficulty value, in one transaction per batch.
+    Changed recipes get a new content_version (cached fragments) and drop out of the object cache, and their
+    owners' version stamps are bumped (cached charts and page ETags).
+    Returns (recipes checked, recipes changed). RecipeStats must be rebuilt afterwards.
+    """
+    checked = changed = 0
+    last_pk = None
+    changed_owners = set()
+    try:
+      while True:
+        qs_batch = self.order_by('pk')
+        if last_pk is not None:
+          qs_batch = qs_batch.filter(pk__gt=last_pk)
+        rows = list(qs_batch.values_list('pk', 'user_id', 'cooking_time', 'ingredients', 'difficulty')[:batch_size])
+        if not rows:
+          break
+        last_pk = rows[-1][0]
+        checked += len(rows)
+
+        recipe_ids, user_ids, cooking_times, ingredients, stored = zip(*rows)
+        difficulties = calculate_difficulties(cooking_times, [count_ingredients(value) for value in ingredients])
+        changes = {}
+        owners = set()
+        for recipe_id, user_id, old, new in zip(recipe_ids, user_ids, stored, difficulties.tolist()):
+          if old != new:
+            changes.setdefault(new, []).append(recipe_id)
+            owners.add(user_id)
+        if not changes or dry_run:
+          changed += sum(len(ids) for ids in changes.values())
+          continue
+
+        with transaction.atomic():
+          for difficulty, ids in changes.items():
+            Recipe.objects.filter(pk__in=ids).update(
+              difficulty=difficulty, content_version=uuid.uuid4(), updated_at=timezone.now()
+            )
+            changed += len(ids)
+        changed_owners |= owners
+        cache.delete_many([recipe_cache_key(recipe_id) for ids in changes.values() for recipe_id in ids])
+    finally:
+      # Batches are committed one by one, so even an interrupted run invalidates what it changed
+      for owner_id in changed_owners:
+        bump_recipes_version(owner_id)
+    return checked, changed
+
+  def clone_public_for(self, user, batch_size=500):
+    """
+    Copies every public recipe the user can still see into private recipes owned by user.
+    Runs in one transaction with a constant number of queries (bulk inserts, precomputed difficulty).
+    Idempotent: cloned public recipes are hidden from the user, so a second call copies nothing,
+    and concurrent calls for the same user are serialized by locking the user row.
+    Returns the list of created copies.
+    """
+    with transaction.atomic():
+      list(User.objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True))
+
+      hidden = HiddenRecipe.objects.filter(user=user).values('recipe_id')
+      public_recipes = list(self.filter(user__isnull=True).exclude(pk__in=hidden).order_by('pk'))
+      if not public_recipes:
+        return []
+
+      copies = self.bulk_create([
+        Recipe(
+          user=user,
+          source_id=recipe.pk,
+          name=recipe.name,
+          cooking_time=recipe.cooking_time,
+          ingredients=recipe.ingredients,
+          difficulty=recipe.difficulty,
+          description=recipe.description,
+          pic=recipe.pic,
+          pic_variants=recipe.pic_variants,
+        )
+        for recipe in public_recipes
+      ], batch_size=batch_size)
+
+      HiddenRecipe.objects.bulk_create(
+        [HiddenRecipe(user=user, recipe=recipe) for recipe in public_recipes],
+        batch_size=batch_size,
+        ignore_conflicts=True
+      )
+      # The copies were added to the user's stats; the now hidden originals are subtracted
+      RecipeStats.objects.apply(user.pk, removed=[recipe.get_stats_entry() for recipe in public_recipes])
+
+    bump_recipes_version(user.pk)
+    return copies
+
+class Ingredient(models.Model):
+  """
+  Model representing a single ingredient, shared by every recipe that uses it.
+
+  Fields:
+  - name: Normalized (lowercase, single-spaced) ingredient name.
+  """
+
+  name = models.CharField(max_length=500, unique=True)
+
+  def __str__(self):
+    """
+    Returns the ingredient name as its string representation.
+    """
+    return str(self.name)
 
 class Recipe(models.Model):
   """
@@ -11,9 +411,17 @@ class Recipe(models.Model):
   - name: Name of the recipe.
   - cooking_time: Time required to prepare the recipe (in minutes).
   - ingredients: List of ingredients stored as a comma-separated string.
-  - difficulty: Auto-calculated difficulty level based on cooking time and ingredients.
+  - difficulty: Auto-calculated difficulty level based on cooking time and ingredients (see Difficulty).
+  - time_bucket: Auto-calculated cooking-time range used by the charts (see TIME_BUCKET_CHOICES).
   - description: Detailed description of the recipe.
   - pic: Image representing the recipe.
+  - pic_variants: Resized WebP/AVIF copies of pic generated on upload, as {format: {width: name}} (see images.py).
+  - pic_status: Processing state of the last upload (see PicStatus); templates show a placeholder until it is ready.
+  - pic_staged: Name of the upload waiting in the local staging area (empty once processed).
+  - ingredient_items: Normalized ingredients, kept in sync with the ingredients field on save.
+  - source: The public recipe this private copy was made from (copy-on-write).
+  - content_version: Random token replaced on every save; keys the cached template fragments of the recipe.
+  - updated_at: Time of the last save (conditional GET validators for the recipe pages).
   """
  
   user = models.ForeignKey(
@@ -33,11 +441,17 @@ class Recipe(models.Model):
     blank=True
   )
   
-  difficulty = models.CharField(
-    max_length=25, 
+  difficulty = models.PositiveSmallIntegerField(
+    choices=Difficulty.choices,
     editable=False
   )
 
+  time_bucket = models.PositiveSmallIntegerField(
+    choices=TIME_BUCKET_CHOICES,
+    null=True,
+    editable=False
+  ) # Precomputed on save so charts group by an indexed column
+
   description = models.TextField()
 
   pic = models.ImageField(
@@ -45,6 +459,64 @@ class Recipe(models.Model):
     default='no_picture.jpg'
   ) # Stores images in 'media/recipes/' with a default fallback image
 
+  pic_variants = models.JSONField(
+    default=dict,
+    blank=True,
+    editable=False
+  ) # Sized variants of pic for the list cards and detail page (srcset)
+
+  pic_status = models.PositiveSmallIntegerField(
+    choices=PicStatus.choices,
+    default=PicStatus.READY,
+    editable=False
+  )
+
+  pic_staged = models.CharField(
+    max_length=255,
+    blank=True,
+    editable=False
+  ) # Upload accepted by the request, processed and stored by the background workers
+
+  ingredient_items = models.ManyToManyField(
+    Ingredient,
+    through='RecipeIngredient',
+    related_name='recipes',
+    blank=True
+  ) # Indexed ingredient lookups (search and charts)
+
+  source = models.ForeignKey(
+    'self',
+    on_delete=models.SET_NULL,
+    null=True,
+    blank=True,
+    editable=False,
+    related_name='copies'
+  ) # Public recipe this private copy was made from (when a user edits a public recipe)
+
+  content_version = models.UUIDField(
+    default=uuid.uuid4,
+    editable=False
+  ) # Replaced by save() so cached recipe cards and detail bodies are re-rendered
+
+  updated_at = models.DateTimeField(auto_now=True)
+
+  objects = RecipeQuerySet.as_manager()
+
+  class Meta:
+    """
+    Indexes the user-scoped access patterns: a user's recipes plus the public recipes (user is null),
+    paged by id and optionally filtered by difficulty, and the per-user chart groupings.
+    The partial indexes only cover the shared public recipes.
+    """
+    indexes = [
+      models.Index(fields=['user', 'id'], name='recipe_user_id_idx'),
+      models.Index(fields=['user', 'difficulty'], name='recipe_user_difficulty_idx'),
+      models.Index(fields=['user', 'time_bucket'], name='recipe_user_time_bucket_idx'),
+      models.Index(fields=['id'], condition=Q(user__isnull=True), name='recipe_public_idx'),
+      models.Index(fields=['difficulty', 'id'], condition=Q(user__isnull=True), name='recipe_public_difficulty_idx'),
+      models.Index(fields=['id'], condition=~Q(pic_staged=''), name='recipe_pic_staged_idx'),
+    ]
+
   def __str__(self):
     """
     Returns the recipe name as its string representation.
@@ -64,28 +536,310 @@ class Recipe(models.Model):
     Converts the comma-separated ingredient string into a list.
     Returns an empty list if no ingredients are provided.
     """
-    if self.ingredients:
-      return [ingredient.strip() for ingredient in self.ingredients.split(',')]
-    return []
+    return parse_ingredients(self.ingredients)
+
+  def get_stats_entry(self):
+    """
+    Returns what this recipe contributes to its owner's RecipeStats.
+    """
+    return get_stats_entry(self.difficulty, self.time_bucket, self.ingredients)
 
   def calculate_difficulty(self):
     """
     Determines and assigns a difficulty level to the recipe based on cooking time and number of ingredients
+    (see DIFFICULTY_RULES).
     """
-    num_ingredients = len(self.return_ingredients_as_list())
-    
-    if self.cooking_time < 10 and num_ingredients < 4:
-      self.difficulty = 'Easy'
-    elif self.cooking_time < 10 and num_ingredients >= 4:
-      self.difficulty = 'Medium'
-    elif self.cooking_time >= 10 and num_ingredients < 4:
-      self.difficulty = 'Intermediate'
-    else:
-      self.difficulty = 'Hard'
+    self.difficulty = get_difficulty(self.cooking_time, count_ingredients(self.ingredients))
 
   def save(self, *args, **kwargs):
     """
     Overrides the save method in models.py to ensure difficulty is calclulated before saving a Recipe object to database.
     """
     self.calculate_difficulty()
-    super().save(*args, **kwargs)
\ No newline at end of file
+    self.time_bucket = get_time_bucket(self.cooking_time)
+    self.content_version = uuid.uuid4() # Invalidates the cached template fragments of this recipe
+    staged = self.pic and not self.pic._committed
+    if staged:
+      self.stage_pic() # New upload: processed and stored in the background
+    elif not self.pic or self.pic.name == self._meta.get_field('pic').default:
+      self.pic_variants = {}
+    with transaction.atomic():
+      old = None
+      if not self._state.adding and self.pk is not None:
+        old = Recipe.objects.filter(pk=self.pk).values('user_id', 'difficulty', 'time_bucket', 'ingredients').first()
+      super().save(*args, **kwargs)
+      sync_recipe_ingredients([self])
+
+      # Keep the per-user statistics rollup up to date
+      old_entry = get_stats_entry(old['difficulty'], old['time_bucket'], old['ingredients']) if old else None
+      if old and old['user_id'] != self.user_id:
+        update_recipe_stats(old['user_id'], self.pk, old=old_entry)
+        old_entry = None
+      update_recipe_stats(self.user_id, self.pk, old=old_entry, new=self.get_stats_entry())
+      if staged:
+        recipe_id = self.pk
+        transaction.on_commit(lambda: enqueue_recipe_image(recipe_id))
+    invalidate_cached_recipe(self.pk)
+    bump_recipes_version(self.user_id) # Invalidate cached charts for the recipe owner
+
+  def stage_pic(self):
+    """
+    Moves a new upload to the local staging area and marks the picture pending, so the request doesn't wait
+    for the image processing and the storage upload. The default picture is used until it is processed.
+    """
+    staging_storage = get_staging_storage()
+    if self.pic_staged and staging_storage.exists(self.pic_staged):
+      staging_storage.delete(self.pic_staged) # Replaced before it was processed
+    upload = self.pic
+    self.pic_staged = staging_storage.save(os.path.basename(upload.name), upload.file)
+    self.pic = self._meta.get_field('pic').default
+    self.pic_variants = {}
+    self.pic_status = PicStatus.PENDING
+
+  def process_staged_pic(self):
+    """
+    Finishes a staged upload (run by the background workers): strips the metadata, generates the variants,
+    stores the picture and marks it ready. Returns False if another worker claimed the upload first.
+    On errors the picture is marked failed and the staged file is kept for a retry.
+    """
+    staged_name = self.pic_staged
+    claimed = Recipe.objects.filter(
+      pk=self.pk, pic_staged=staged_name, pic_status=PicStatus.PENDING
+    ).update(pic_status=PicStatus.PROCESSING)
+    if not staged_name or not claimed:
+      return False
+
+    staging_storage = get_staging_storage()
+    try:
+      with staging_storage.open(staged_name) as staged:
+        data = staged.read()
+      pic_variants = generate_variants(data)
+      self.pic.save(os.path.basename(staged_name), ContentFile(strip_metadata(data)), save=False)
+    except Exception:
+      Recipe.objects.filter(pk=self.pk, pic_staged=staged_name).update(pic_status=PicStatus.FAILED)
+      raise
+
+    # Re-renders the cached fragments and changes the page validators, unless a newer upload replaced this one
+    Recipe.objects.filter(pk=self.pk, pic_staged=staged_name).update(
+      pic=self.pic.name,
+      pic_variants=pic_variants,
+      pic_status=PicStatus.READY,
+      pic_staged='',
+      content_version=uuid.uuid4(),
+      updated_at=timezone.now(),
+    )
+    staging_storage.delete(staged_name)
+    invalidate_cached_recipe(self.pk)
+    return True
+
+  def backfill_pic_variants(self):
+    """
+    Generates the variants of a picture stored before variants existed (or whose variants failed), from the
+    stored picture. Returns False if Pillow can't read it or the picture changed in the meantime.
+    """
+    with self.pic.storage.open(self.pic.name) as stored:
+      pic_variants = generate_variants(stored.read())
+    if not pic_variants:
+      return False
+    updated = Recipe.objects.filter(pk=self.pk, pic=self.pic.name, pic_status=PicStatus.READY).update(
+      pic_variants=pic_variants,
+      content_version=uuid.uuid4(),
+      updated_at=timezone.now(),
+    )
+    invalidate_cached_recipe(self.pk)
+    return bool(updated)
+
+  def is_pic_pending(self):
+    """
+    Returns True while an uploaded picture is waiting to be processed.
+    """
+    return self.pic_status in (PicStatus.PENDING, PicStatus.PROCESSING)
+
+  def is_public(self):
+    """
+    Returns True for shared public recipes (not owned by any user).
+    """
+    return self.user_id is None
+
+  def save_as_private_copy(self, user):
+    """
+    Copy-on-write for public recipes: saves this public recipe (including any unsaved edits)
+    as a new recipe owned by user, and hides the original from that user.
+    """
+    public_recipe_id = self.pk
+    with transaction.atomic():
+      self.pk = None
+      self._state.adding = True
+      self.user = user
+      self.source_id = public_recipe_id
+      self.pic_staged = '' # The public recipe's pending upload is not shared (save() stages a new one)
+      self.pic_status = PicStatus.READY
+      self.save()
+      HiddenRecipe.objects.get_or_create(user=user, recipe_id=public_recipe_id)
+
+  def delete(self, *args, **kwargs):
+    """
+    Overrides the delete method to remove the recipe from the object cache and invalidate cached charts
+    for the recipe owner.
+    """
+    user_id = self.user_id
+    recipe_id = self.pk
+    with transaction.atomic():
+      update_recipe_stats(user_id, recipe_id, old=self.get_stats_entry())
+      result = super().delete(*args, **kwargs)
+    invalidate_cached_recipe(recipe_id)
+    bump_recipes_version(user_id)
+    return result
+
+class RecipeIngredient(models.Model):
+  """
+  Through table linking a recipe to each of its normalized ingredients.
+  """
+
+  recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='recipe_ingredients')
+
+  ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='recipe_ingredients')
+
+  class Meta:
+    """
+    Links each ingredient to a recipe only once and indexes lookups by ingredient.
+    """
+    constraints = [
+      models.UniqueConstraint(fields=['recipe', 'ingredient'], name='unique_recipe_ingredient'),
+    ]
+    indexes = [
+      models.Index(fields=['ingredient', 'recipe'], name='recipe_ingredient_lookup_idx'),
+    ]
+
+class HiddenRecipe(models.Model):
+  """
+  Model recording a public recipe that a user no longer sees.
+  Created when a user deletes a public recipe or replaces it with a private copy.
+
+  Fields:
+  - user: The user the recipe is hidden from.
+  - recipe: The hidden public recipe.
+  """
+
+  user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hidden_recipes')
+
+  recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='hidden_by')
+
+  class Meta:
+    """
+    Hides each public recipe from a user at most once.
+    """
+    constraints = [
+      models.UniqueConstraint(fields=['user', 'recipe'], name='unique_hidden_recipe'),
+    ]
+
+  def save(self, *args, **kwargs):
+    """
+    Overrides the save method to subtract the hidden recipe from the user's stats and invalidate cached charts.
+    """
+    with transaction.atomic():
+      adding = self._state.adding
+      super().save(*args, **kwargs)
+      if adding:
+        RecipeStats.objects.apply(self.user_id, removed=[self.recipe.get_stats_entry()])
+    bump_recipes_version(self.user_id)
+
+  def delete(self, *args, **kwargs):
+    """
+    Overrides the delete method to add the recipe back to the user's stats and invalidate cached charts.
+    """
+    user_id = self.user_id
+    with transaction.atomic():
+      RecipeStats.objects.apply(user_id, added=[self.recipe.get_stats_entry()])
+      result = super().delete(*args, **kwargs)
+    bump_recipes_version(user_id)
+    return result
+
+class RecipeStatsQuerySet(models.QuerySet):
+  """
+  QuerySet for the per-user statistics rollup.
+  """
+
+  def apply(self, owner_id, added=(), removed=()):
+    """
+    Adds and removes recipe stats entries (see get_stats_entry) for one owner (None for public recipes).
+    Locks the row for the read-modify-write, so concurrent updates don't lose counts.
+    """
+    if not added and not removed:
+      return
+    with transaction.atomic():
+      stats, _ = self.select_for_update().get_or_create(user_id=owner_id)
+      counts = [Counter(stats.difficulty_counts), Counter(stats.time_bucket_counts), Counter(stats.ingredient_counts)]
+      for entries, sign in ((added, 1), (removed, -1)):
+        for entry in entries:
+          add_stats_entry(counts, entry, sign)
+      stats.difficulty_counts, stats.time_bucket_counts, stats.ingredient_counts = compact_stats_counts(counts)
+      stats.save()
+
+  def totals_for(self, user):
+    """
+    Returns the stats of every recipe the user can see (their row plus the public row),
+    as Counters keyed by difficulty, time bucket and ingredient name.
+    """
+    totals = {'difficulty': Counter(), 'time_bucket': Counter(), 'ingredients': Counter()}
+    for stats in self.filter(Q(user=user) | Q(user__isnull=True)):
+      totals['difficulty'].update({int(key): count for key, count in stats.difficulty_counts.items()})
+      totals['time_bucket'].update({int(key): count for key, count in stats.time_bucket_counts.items()})
+      totals['ingredients'].update(stats.ingredient_counts)
+    return totals
+
+  def rebuild(self):
+    """
+    Recomputes every row from the recipe tables and fixes any that drifted.
+    Returns the number of rows created, updated or deleted.
+    """
+    expected = compute_recipe_stats(
+      Recipe.objects.values_list('id', 'user_id', 'difficulty', 'time_bucket', 'ingredients').iterator(),
+      HiddenRecipe.objects.values_list('user_id', 'recipe_id').iterator(),
+    )
+    fixed = 0
+    with transaction.atomic():
+      for stats in self.select_for_update():
+        counts = expected.pop(stats.user_id, ({}, {}, {}))
+        if counts != (stats.difficulty_counts, stats.time_bucket_counts, stats.ingredient_counts):
+          stats.difficulty_counts, stats.time_bucket_counts, stats.ingredient_counts = counts
+          stats.save()
+          fixed += 1
+      self.bulk_create([
+        RecipeStats(user_id=owner_id, difficulty_counts=counts[0], time_bucket_counts=counts[1], ingredient_counts=counts[2])
+        for owner_id, counts in expected.items()
+      ])
+    return fixed + len(expected)
+
+class RecipeStats(models.Model):
+  """
+  Model holding precomputed chart statistics for one recipe owner, updated incrementally
+  by Recipe.save/delete, HiddenRecipe.save/delete and the bulk recipe paths.
+  A user's row counts their own recipes minus the public recipes they have hidden,
+  so the charts of everything a user can see add up their row and the public row.
+  Use "manage.py rebuild_recipe_stats" to reconcile drift (e.g. after QuerySet.update()).
+
+  Fields:
+  - user: The recipe owner (null for the public recipes row).
+  - difficulty_counts: Number of recipes per difficulty value.
+  - time_bucket_counts: Number of recipes per cooking-time bucket.
+  - ingredient_counts: Number of recipes per normalized ingredient name.
+  """
+
+  user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='recipe_stats')
+
+  difficulty_counts = models.JSONField(default=dict)
+
+  time_bucket_counts = models.JSONField(default=dict)
+
+  ingredient_counts = models.JSONField(default=dict)
+
+  objects = RecipeStatsQuerySet.as_manager()
+
+  class Meta:
+    """
+    Keeps a single row per owner, including a single public row (user is null).
+    """
+    constraints = [
+      models.UniqueConstraint(Coalesce('user', Value(0)), name='unique_recipe_stats_owner'),
+    ]
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Full-text recipe search for BiteBase.
+Searches recipe names, ingredients and descriptions with ranking and highlighting
+(the indexes are created by migrations 0010 and 0018):
+- PostgreSQL: a generated, weighted tsvector column with a GIN index.
+- SQLite: an FTS5 virtual table, kept up to date by triggers on the recipe table.
+- Other databases: a basic (unranked) icontains fallback.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# Private-use characters marking highlighted terms, replaced by <mark> tags after escaping
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_END = '\ue001'
+
+def get_search_terms(text):
+  """ Splits user input into plain search terms (punctuation and query operators are dropped). """
+  return re.findall(r'\w+', text.lower())
+
+def format_highlight(snippet):
+  """ Escapes a search snippet and wraps the highlighted terms in <mark> tags. """
+  if not snippet:
+    return ''
+  html = escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>')
+  return mark_safe(html)
+
+class BasicSearchBackend:
+  """
+  Fallback backend for databases without full-text search: filters with icontains, no ranking.
+  """
+
+  def install_triggers(self, cursor):
+    """ Creates the triggers keeping the search index in sync with the recipe table (nothing to create for this backend). """
+
+  def filter(self, qs_recipes, text='', name=''):
+    """ Restricts recipes to those matching every term of text (any field) and name (recipe name only). """
+    for term in get_search_terms(text):
+      qs_recipes = qs_recipes.filter(
+        Q(name__icontains=term) | Q(ingredients__icontains=term) | Q(description__icontains=term)
+      )
+    for term in get_search_terms(name):
+      qs_recipes = qs_recipes.filter(name__icontains=term)
+    return qs_recipes
+
+  def annotate(self, qs_recipes, text='', name=''):
+    """ Adds search_rank (lower is better) to matching recipes. """
+    return qs_recipes.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+  def highlight(self, recipes, text='', name=''):
+    """
+    Sets search_highlight (a snippet with the matched terms marked) on already-fetched recipes.
+    Runs apart from annotate(), so snippets are only built for the visible page.
+    """
+    snippets = self.get_highlights([recipe.pk for recipe in recipes], text, name) if recipes else {}
+    for recipe in recipes:
+      recipe.search_highlight = snippets.get(recipe.pk, '')
+
+  def get_highlights(self, recipe_ids, text, name):
+    """ Returns {recipe id: snippet} for the given recipes (no snippets for this backend). """
+    return {}
+
+class PostgresSearchBackend(BasicSearchBackend):
+  """
+  PostgreSQL backend: a generated tsvector column (name weighted A, ingredients B, description C)
+  with a GIN index. The database keeps the column up to date on every insert and update.
+  """
+
+  def build_query(self, text, name):
+    """ Builds a prefix-matching tsquery; name terms only match the name (weight A). """
+    terms = [f'{term}:*' for term in get_search_terms(text)]
+    terms += [f'{term}:*A' for term in get_search_terms(name)]
+    return ' & '.join(terms)
+
+  def filter(self, qs_recipes, text='', name=''):
+    query = self.build_query(text, name)
+    if not query:
+      return qs_recipes
+    return qs_recipes.filter(pk__in=RawSQL(
+      "SELECT id FROM recipes_recipe WHERE search_vector @@ to_tsquery('english', %s)", [query]
+    ))
+
+  def annotate(self, qs_recipes, text='', name=''):
+    query = self.build_query(text, name)
+    if not query:
+      return super().annotate(qs_recipes)
+    # ts_rank returns real: cast it, so the rank cursor (a Python float) compares equal to the rank it came from
+    return qs_recipes.annotate(search_rank=RawSQL(
+      "(-ts_rank(recipes_recipe.search_vector, to_tsquery('english', %s)))::double precision", [query], output_field=FloatField()
+    ))
+
+  def get_highlights(self, recipe_ids, text, name):
+    query = self.build_query(text, name)
+    if not query:
+      return {}
+    with connection.cursor() as cursor:
+      cursor.execute(
+        "SELECT id, ts_headline('english', concat_ws(' - ', ingredients, description), to_tsquery('english', %s), %s) "
+        "FROM recipes_recipe WHERE id = ANY(%s)",
+        [query, f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=20, MinWords=8', list(recipe_ids)]
+      )
+      return dict(cursor.fetchall())
+
+class SQLiteSearchBackend(BasicSearchBackend):
+  """
+  SQLite backend: an FTS5 virtual table (rowid = recipe id) ranked with bm25.
+  Triggers on recipes_recipe write its rows, so every change (including cascades and
+  QuerySet.update/delete) reaches the index.
+  """
+
+  table = 'recipes_recipe_fts'
+
+  # Triggers keeping the FTS table in sync with recipes_recipe (a frozen copy lives in migration 0018)
+  triggers = {
+    'recipes_recipe_fts_insert': (
+      'AFTER INSERT ON recipes_recipe BEGIN '
+      'INSERT INTO recipes_recipe_fts(rowid, name, ingredients, description) '
+      'VALUES (new.id, new.name, new.ingredients, new.description); END'
+    ),
+    'recipes_recipe_fts_update': (
+      'AFTER UPDATE OF id, name, ingredients, description ON recipes_recipe BEGIN '
+      'DELETE FROM recipes_recipe_fts WHERE rowid = old.id; '
+      'INSERT INTO recipes_recipe_fts(rowid, name, ingredients, description) '
+      'VALUES (new.id, new.name, new.ingredients, new.description); END'
+    ),
+    'recipes_recipe_fts_delete': (
+      'AFTER DELETE ON recipes_recipe BEGIN DELETE FROM recipes_recipe_fts WHERE rowid = old.id; END'
+    ),
+  }
+
+  def install_triggers(self, cursor):
+    """
+    Creates the missing triggers. SQLite drops a table's triggers when a migration rebuilds the table,
+    so this runs again after every migrate (see RecipesConfig.ready).
+    """
+    for name, body in self.triggers.items():
+      cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+
+  def build_query(self, text, name):
+    """ Builds an FTS5 query of quoted prefix terms; name terms are restricted to the name column. """
+    terms = [f'"{term}"*' for term in get_search_terms(text)]
+    terms += [f'name : "{term}"*' for term in get_search_terms(name)]
+    return ' AND '.join(terms)
+
+  def filter(self, qs_recipes, text='', name=''):
+    query = self.build_query(text, name)
+    if not query:
+      return qs_recipes
+    return qs_recipes.filter(pk__in=RawSQL(
+      f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [query]
+    ))
+
+  def annotate(self, qs_recipes, text='', name=''):
+    query = self.build_query(text, name)
+    if not query:
+      return super().annotate(qs_recipes)
+    # Join the FTS table once (the MATCH drives the query) rather than searching it again for every recipe row;
+    # column weights for bm25: name, ingredients, description
+    return qs_recipes.extra(
+      tables=[self.table],
+      where=[f'{self.table} MATCH %s', f'{self.table}.rowid = recipes_recipe.id'],
+      params=[query],
+    ).annotate(search_rank=RawSQL(f'bm25({self.table}, 10.0, 5.0, 1.0)', [], output_field=FloatField()))
+
+  def get_highlights(self, recipe_ids, text, name):
+    query = self.build_query(text, name)
+    if not query:
+      return {}
+    placeholders = ', '.join(['%s'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+      cursor.execute(
+        f"SELECT rowid, snippet({self.table}, -1, %s, %s, '...', 16) FROM {self.table} "
+        f'WHERE {self.table} MATCH %s AND rowid IN ({placeholders})',
+        [HIGHLIGHT_START, HIGHLIGHT_END, query, *recipe_ids]
+      )
+      return dict(cursor.fetchall())
+
+def get_search_backend(db_connection=None):
+  """ Returns the search backend for the database in use. """
+  vendor = (db_connection or connection).vendor
+  if vendor == 'postgresql':
+    return PostgresSearchBackend()
+  if vendor == 'sqlite':
+    return SQLiteSearchBackend()
+  return BasicSearchBackend()
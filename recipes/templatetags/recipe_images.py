@@ -0,0 +1,21 @@
+from django import template
+from ..images import PICTURE_SIZES, get_picture_sources
+
+register = template.Library()
+
+@register.inclusion_tag('recipes/recipe_picture.html')
+def recipe_picture(recipe, size, css_class='', alt=''):
+  """
+  Renders a recipe picture as <picture> with WebP/AVIF srcsets of its variants for size ('card' or 'detail').
+  Falls back to the original upload (pictures without variants, browsers without WebP support),
+  and shows a placeholder while a new upload is being processed.
+  """
+  return {
+    'recipe': recipe,
+    'pending': recipe.is_pic_pending(),
+    'sources': get_picture_sources(recipe.pic_variants, size),
+    'sizes': PICTURE_SIZES[size],
+    'css_class': css_class,
+    'alt': alt or recipe.name,
+    'lazy': size == 'card',
+  }
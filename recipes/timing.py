@@ -0,0 +1,62 @@
+"""
+Per-request measurements: database queries and named spans.
+measure_request() collects them for the request being handled (see RequestTimingMiddleware), and
+timing_span() times a step of it, such as the chart rendering. Kept apart from the middleware so
+views and the chart engine can be instrumented without importing it.
+"""
+
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.db import connections
+
+# Timings of the request being handled by the current thread (None outside requests)
+_current_timings = ContextVar('recipes_request_timings', default=None)
+
+class RequestTimings:
+  """ Measurements of one request: database queries and named spans (seconds). """
+
+  def __init__(self):
+    self.db_queries = 0
+    self.db_seconds = 0.0
+    self.spans = {}
+
+  def record_query(self, execute, sql, params, many, context):
+    """ Database execute wrapper: runs the query and adds its time. """
+    start = perf_counter()
+    try:
+      return execute(sql, params, many, context)
+    finally:
+      self.db_queries += 1
+      self.db_seconds += perf_counter() - start
+
+  def add_span(self, name, seconds):
+    """ Adds seconds to a named span (repeated spans add up). """
+    self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+@contextmanager
+def measure_request():
+  """ Collects the queries (on every database) and spans of the enclosed block; yields the RequestTimings. """
+  timings = RequestTimings()
+  token = _current_timings.set(timings)
+  try:
+    with ExitStack() as stack:
+      for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timings.record_query))
+      yield timings
+  finally:
+    _current_timings.reset(token)
+
+@contextmanager
+def timing_span(name):
+  """ Times the enclosed block as a named span of the current request (a no-op outside requests). """
+  timings = _current_timings.get()
+  if timings is None:
+    yield
+    return
+  start = perf_counter()
+  try:
+    yield
+  finally:
+    timings.add_span(name, perf_counter() - start)
@@ -1,20 +1,35 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path
+from django.urls import path, register_converter
+from django.urls.converters import IntConverter
+from .middleware import timing_stats_view
+from .api import recipe_list_api, recipe_detail_api, recipe_import_api, recipe_export_api
 from .views import (
-  home, recipe_list, RecipeDetailView, create_recipe_view, edit_recipe_view, delete_recipe_view, 
-  about_me_view, profile_view, delete_account_view, login_view, logout_view, logout_success, signup_view
+  home, recipe_list, recipe_chart, RecipeDetailView, create_recipe_view, edit_recipe_view, delete_recipe_view, 
+  about_me_view, profile_view, delete_account_view, login_view, logout_view, logout_success, signup_view,
+  is_recipe_id
 )
 
+class RecipeIdConverter(IntConverter):
+  """ Matches recipe ids that fit the id column, so larger numbers are a 404 instead of a database error. """
+  def to_python(self, value):
+    pk = super().to_python(value)
+    if not is_recipe_id(pk):
+      raise ValueError('Not a recipe id.')
+    return pk
+
+register_converter(RecipeIdConverter, 'recipe_id')
+
 app_name = 'recipes'
 
 urlpatterns = [
   path('', home, name='home'),
   path('recipes/', recipe_list, name='recipe_list'),
-  path('recipes/<int:pk>/', RecipeDetailView.as_view(), name='recipe_detail'),
+  path('recipes/chart/', recipe_chart, name='recipe_chart'),
+  path('recipes/<recipe_id:pk>/', RecipeDetailView.as_view(), name='recipe_detail'),
   path('create-recipe/', create_recipe_view, name='create_recipe'),
-  path('recipes/<int:pk>/edit/', edit_recipe_view, name='edit_recipe'),
-  path('recipes/<int:pk>/delete/', delete_recipe_view, name='delete_recipe'),
+  path('recipes/<recipe_id:pk>/edit/', edit_recipe_view, name='edit_recipe'),
+  path('recipes/<recipe_id:pk>/delete/', delete_recipe_view, name='delete_recipe'),
   path('about-me/', about_me_view, name='about_me'),
   path('profile/', profile_view, name='profile'),
   path('delete-account/', delete_account_view, name='delete_account'),
@@ -23,6 +38,15 @@ urlpatterns = [
   path('logout/', logout_view, name='logout'),
   path('logout-success/', logout_success, name='logout_success'),
   path('signup/', signup_view, name='signup'),
+
+  # JSON API (see recipes/api.py)
+  path('api/recipes/', recipe_list_api, name='api_recipe_list'),
+  path('api/recipes/<recipe_id:pk>/', recipe_detail_api, name='api_recipe_detail'),
+  path('api/recipes/import/', recipe_import_api, name='api_recipe_import'),
+  path('api/recipes/export/', recipe_export_api, name='api_recipe_export'),
+
+  # Rolling per-view timing percentiles (REQUEST_TIMING_STATS, local requests only)
+  path('_timings/', timing_stats_view, name='timing_stats'),
 ]
 
 # Serve media files during development mode
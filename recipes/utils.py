@@ -3,101 +3,198 @@
 """
 Utility functions for chart generation in BiteBase.
 Handles data visualization using Matplotlib and processes chart images.
+Matplotlib and pandas are imported lazily (see get_figure_classes() and get_pandas()), so pages
+that never draw a chart or build a table don't pay for loading them.
+Charts are drawn on standalone Figure objects with an explicit Agg canvas (no global pyplot state).
+Each thread draws on its own Figure, cleared after every chart, so renders run in parallel without a lock
+(Matplotlib keeps its FreeType fonts per thread) and the text layout caches, keyed by the figure's renderer,
+stop growing once the chart labels have been seen.
 """
 
+from functools import lru_cache
 from io import BytesIO
 import base64
-import matplotlib.pyplot as plt
-import pandas as pd # pandas for data manipulation
+import threading
 
-def get_graph():
+from .timing import timing_span
+
+# Figure of the current thread (see get_figure())
+_local = threading.local()
+
+@lru_cache(maxsize=None)
+def get_pandas():
+  """
+  Imports pandas on first use and returns the module.
+  """
+  import pandas
+  return pandas
+
+@lru_cache(maxsize=None)
+def get_figure_classes():
+  """
+  Imports Matplotlib's Figure, SubplotParams and Agg canvas on first use and returns (Figure, SubplotParams, FigureCanvasAgg).
+  """
+  from matplotlib.figure import Figure, SubplotParams
+  from matplotlib.backends.backend_agg import FigureCanvasAgg
+  return Figure, SubplotParams, FigureCanvasAgg
+
+def get_figure():
+  """
+  Returns this thread's chart Figure (8x5 inches, with an attached Agg canvas), created on first use.
+  Callers must reset it when done (see reset_figure()), so the next chart starts from an empty figure.
+  """
+  fig = getattr(_local, 'figure', None)
+  if fig is None:
+    Figure, _, FigureCanvasAgg = get_figure_classes()
+    fig = _local.figure = Figure(figsize = (8, 5)) # Set chart figure size
+    FigureCanvasAgg(fig) # Attach a non-GUI Agg canvas to this figure only
+  return fig
+
+def reset_figure(fig):
   """
-  get_graph() takes care of low-level image-handling details for charts.
-  get_graph() must be called by another function--called "get_chart()".
-  Converts Matplotlib chart to a base64-encoded string.
-  Returns: str: Base64 encoded image.
+  Clears a chart Figure and restores the default subplot parameters (tight_layout() changes them and
+  clear() keeps them), so every chart is drawn the same way whatever the thread drew before.
+  """
+  fig.clear() # Release the chart's artists
+  fig.subplotpars = get_figure_classes()[1]()
+
+# Supported chart types ("#1" - Bar, "#2" - Pie, "#3" - Line)
+CHART_TYPES = ('#1', '#2', '#3')
+
+# Difficulty levels in chart order
+DIFFICULTY_ORDER = ['Easy', 'Medium', 'Intermediate', 'Hard']
+
+# Cooking time buckets for the pie chart: [lower, upper) bounds in minutes and their labels
+TIME_BINS = [0, 10, 30, 60, float('inf')]
+TIME_LABELS = ['0-10 mins', '11-30 mins', '31-60 mins', '60+ mins']
+
+# Supported image formats and their content types
+CHART_FORMATS = {
+  'png': 'image/png',
+  'svg': 'image/svg+xml',
+}
+
+def get_graph_bytes(fig, image_format='png'):
+  """
+  get_graph_bytes() takes care of low-level image-handling details for charts.
+  Saves a Matplotlib figure and returns the raw image bytes.
+  Args:
+  - fig (Figure): Figure with an attached Agg canvas.
+  - image_format (str): "png" or "svg".
+  Returns: bytes: Encoded image.
   """
   buffer = BytesIO() # Create a BytesIO buffer for the image
-  plt.savefig(buffer, format='png') # Save the plot as a PNG image in buffer
-  buffer.seek(0) # Move cursor to the start of the buffer
-  image_png = buffer.getvalue() # Retrieve image data from buffer
-  graph = base64.b64encode(image_png).decode('utf-8') # Convert to base64 string
+  fig.savefig(buffer, format=image_format) # Save the figure in buffer
+  image = buffer.getvalue() # Retrieve image data from buffer
   buffer.close() # Free memory by closing the buffer
-  return graph # Return the base64-encdoed image
+  return image
 
-def get_chart(chart_type, data):
+def render_chart(chart_type, data, image_format='png'):
   """
   Generates a chart based on the selected type and data.
   Args:
   - chart_type (str): The type of chart ("#1" - Bar, "#2" - Pie, "#3" - Line).
-  - data (DataFrame): Recipe data.
+  - data (DataFrame or Series): Recipe rows, or pre-aggregated counts (indexed by difficulty,
+    time bucket label or ingredient name for "#1", "#2" and "#3" respectively).
+  - image_format (str): "png" or "svg".
   Returns:
-  - str or None: Base64-encoded chart image or None if invalid chart type.
+  - bytes or None: Chart image or None if invalid chart type.
   """
-  plt.switch_backend('AGG') # Use AGG backend (no GUI)
-  fig = plt.figure(figsize = (8, 5)) # Set chart figure size
-
-  # Bar Chart - Recipes by Difficulty
-  if chart_type == '#1':
-    difficulty_order = ['Easy', 'Medium', 'Intermediate', 'Hard']
-    difficulty_counts = data['difficulty'].value_counts().reindex(difficulty_order, fill_value=0)
-    
-    plt.bar(
-      difficulty_counts.index, 
-      difficulty_counts.values, 
-      color = ['#2a9d8f', '#f4a261', '#e76f51', '#264653']
-    )
-    plt.xlabel('Difficulty Level', fontsize=16)
-    plt.ylabel('Number of Recipes', fontsize=16)
-    plt.title('Recipes by Difficulty Level', fontsize=20)
-  
-  # Pie Chart - Cooking Time Distribution
-  elif chart_type == '#2':
-    bins = [0, 10, 30, 60, float('inf')] # Define time range bins
-    labels = ['0-10 mins', '11-30 mins', '31-60 mins', '60+ mins']
-    data['time_category'] = pd.cut(data['cooking_time'], bins=bins, labels=labels, right=False)
-    time_distribution = data['time_category'].value_counts()
-    colors = ['#2a9d8f', '#f4a261', '#e76f51', '#264653']
-
-    def count_labels(pct):
-      """ Converts percentage to count for pie chart labels. """
-      total = sum(time_distribution)
-      count = int(pct * total / 100)
-      return f'{count}\nrecipes' if count > 0 else ''
-
-    plt.pie(
-      time_distribution, 
-      labels = labels,
-      colors = colors,
-      autopct = count_labels,
-      labeldistance = 1.1,
-      startangle = 140,
-      textprops = {'fontsize': 12}
-    )
-    plt.title('Cooking Time Distribution', fontsize=20)
-
-  # Line Chart - Most Common Ingredients
-  elif chart_type == '#3':
-    ingredient_counts = (
-      data['ingredients']
-      .str.split(',')
-      .explode()
-      .str.strip()
-      .value_counts()
-      .head(5)
-    )
-
-    plt.plot(ingredient_counts.index, ingredient_counts.values, marker = 'o', linestyle = '-')
-    plt.xlabel('Ingredients (Top 5)', fontsize = 16)
-    plt.ylabel('# of Recipes Containing Ingredient', fontsize = 16)
-    plt.title('Most Common Ingredients in Recipes', fontsize = 20)
-
-    plt.xticks(rotation = 20, ha = 'right', fontsize = 14)
-    plt.yticks(fontsize = 14)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-  else:
+  if chart_type not in CHART_TYPES:
     return None # Return None if an invalid chart type is provided
 
-  plt.tight_layout() # Prevent overlap in chart layout
-  return get_graph() # Return the generated chart as a base64 string
\ No newline at end of file
+  pd = get_pandas() # pandas for data manipulation
+  fig = get_figure() # This thread's figure (empty)
+  ax = fig.add_subplot()
+
+  try:
+    # Bar Chart - Recipes by Difficulty
+    if chart_type == '#1':
+      if isinstance(data, pd.Series):
+        difficulty_counts = data # Counts already aggregated by the database
+      else:
+        difficulty_counts = data['difficulty'].value_counts()
+      difficulty_counts = difficulty_counts.reindex(DIFFICULTY_ORDER, fill_value=0)
+
+      ax.bar(
+        difficulty_counts.index, 
+        difficulty_counts.values, 
+        color = ['#2a9d8f', '#f4a261', '#e76f51', '#264653']
+      )
+      ax.set_xlabel('Difficulty Level', fontsize=16)
+      ax.set_ylabel('Number of Recipes', fontsize=16)
+      ax.set_title('Recipes by Difficulty Level', fontsize=20)
+
+    # Pie Chart - Cooking Time Distribution
+    elif chart_type == '#2':
+      labels = TIME_LABELS
+      if isinstance(data, pd.Series):
+        time_distribution = data # Counts already aggregated by the database
+      else:
+        time_categories = pd.cut(data['cooking_time'], bins=TIME_BINS, labels=labels, right=False)
+        time_distribution = time_categories.value_counts()
+      time_distribution = time_distribution.reindex(labels, fill_value=0) # Keep values aligned with labels
+      colors = ['#2a9d8f', '#f4a261', '#e76f51', '#264653']
+
+      def count_labels(pct):
+        """ Converts percentage to count for pie chart labels. """
+        total = sum(time_distribution)
+        count = int(round(pct * total / 100))
+        return f'{count}\nrecipes' if count > 0 else ''
+
+      ax.pie(
+        time_distribution, 
+        labels = labels,
+        colors = colors,
+        autopct = count_labels,
+        labeldistance = 1.1,
+        startangle = 140,
+        textprops = {'fontsize': 12}
+      )
+      ax.set_title('Cooking Time Distribution', fontsize=20)
+
+    # Line Chart - Most Common Ingredients
+    elif chart_type == '#3':
+      if isinstance(data, pd.Series):
+        ingredient_counts = data.head(5) # Counts already aggregated by the database
+      else:
+        ingredient_counts = (
+          data['ingredients']
+          .str.split(',')
+          .explode()
+          .str.strip()
+          .value_counts()
+          .head(5)
+        )
+
+      ax.plot(ingredient_counts.index, ingredient_counts.values, marker = 'o', linestyle = '-')
+      ax.set_xlabel('Ingredients (Top 5)', fontsize = 16)
+      ax.set_ylabel('# of Recipes Containing Ingredient', fontsize = 16)
+      ax.set_title('Most Common Ingredients in Recipes', fontsize = 20)
+
+      ax.tick_params(axis = 'x', labelrotation = 20, labelsize = 14)
+      ax.tick_params(axis = 'y', labelsize = 14)
+      for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+      ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    fig.tight_layout() # Prevent overlap in chart layout
+    return get_graph_bytes(fig, image_format) # Return the generated chart image
+
+  finally:
+    reset_figure(fig) # Leave the figure empty for this thread's next chart
+
+def get_chart(chart_type, data):
+  """
+  Generates a chart and returns it as a base64-encoded PNG.
+  Args:
+  - chart_type (str): The type of chart ("#1" - Bar, "#2" - Pie, "#3" - Line).
+  - data (DataFrame): Recipe data.
+  Returns:
+  - str or None: Base64-encoded chart image or None if invalid chart type.
+  """
+  with timing_span('chart'):
+    image_png = render_chart(chart_type, data)
+  if image_png is None:
+    return None
+  return base64.b64encode(image_png).decode('utf-8')
\ No newline at end of file
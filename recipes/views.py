@@ -9,21 +9,29 @@ from django.contrib.auth.mixins import LoginRequiredMixin     # Protect CBVs
 from django.contrib.auth.decorators import login_required     # Protect FBVs
 from django.contrib.auth import authenticate, login, logout   # Django authentication libraries
 from django.contrib.auth.forms import AuthenticationForm
-from django.contrib.auth.models import User
 
 # Forms & Models
-from .models import Recipe
+from .models import Recipe, Ingredient, HiddenRecipe, RecipeStats, Difficulty, normalize_ingredient, get_hidden_recipe_ids
 from .forms import RecipeSearchForm, SignupForm, CreateRecipeForm
 
 # Utilities & Additional Libraries
-import pandas as pd
-from .utils import get_chart
+import hashlib
+import math
+from urllib.parse import urlencode
+from .utils import get_pandas, render_chart, CHART_TYPES, CHART_FORMATS, TIME_LABELS
+from .cache import chart_cache, get_scope_version
+from .search import get_search_backend, format_highlight
+from .timing import timing_span
 
 # Django Utlities
+from django.conf import settings
 from django.utils.timezone import now, localtime
 from django.urls import reverse
-from django.db.models import Q
-from django.http import HttpResponseRedirect, Http404, JsonResponse
+from django.db.models import Count, FileField, Max, Q
+from django.http import HttpResponse, HttpResponseRedirect, Http404, JsonResponse
+from django.views.decorators.http import condition
+from django.views.decorators.cache import cache_control
+from django.utils.decorators import method_decorator
 from django.contrib import messages     # Django Messages Framework
 
 class RecipeListView(LoginRequiredMixin, ListView):
@@ -31,107 +39,395 @@ class RecipeListView(LoginRequiredMixin, ListView):
   model = Recipe
   template_name = 'recipes/recipes_home.html'
 
+def has_pending_messages(request):
+  """ Pages showing one-off messages must be rendered, not answered from the browser cache. """
+  return 'deleted_recipe_message' in request.session or len(messages.get_messages(request)) > 0
+
+def get_page_etag(request, qs_recipes):
+  """
+  ETag for a recipe page showing qs_recipes, or None when the page has to be rendered anyway.
+  Derived from the version stamps (bumped by hides and deletes too), the latest updated_at and the number
+  of the recipes (one aggregate query), the user and the query string.
+  There is no Last-Modified: hiding or deleting a recipe doesn't move the latest updated_at.
+  """
+  if not request.user.is_authenticated or has_pending_messages(request):
+    return None
+  stats = qs_recipes.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+  key = (
+    request.path,
+    sorted(request.GET.lists()),
+    request.user.pk,
+    request.user.username,
+    request.user.get_full_name(),
+    get_scope_version(request.user),
+    stats['count'],
+    stats['last_modified'],
+    settings.RELEASE_VERSION,
+  )
+  return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+def get_visible_recipe(request, pk):
+  """
+  Returns the recipe if the user can see it (their own, or public and not hidden by them), otherwise None.
+  Served from the recipe object cache and looked up once per request.
+  """
+  visible_recipes = request.__dict__.setdefault('_visible_recipes', {})
+  if pk not in visible_recipes:
+    recipe = Recipe.objects.get_cached(pk)
+    if recipe is not None and recipe.user_id != request.user.pk:
+      if not recipe.is_public() or recipe.pk in get_hidden_recipe_ids(request.user):
+        recipe = None
+    visible_recipes[pk] = recipe
+  return visible_recipes[pk]
+
+def detail_validators(request, pk):
+  """ Conditional GET validators for a recipe detail page (none if the user can't see the recipe). """
+  if not request.user.is_authenticated or has_pending_messages(request):
+    return (None, None)
+  recipe = get_visible_recipe(request, pk)
+  if recipe is None:
+    return (None, None)
+  key = (recipe.pk, recipe.content_version, recipe.updated_at, request.user.pk, settings.RELEASE_VERSION)
+  return (hashlib.sha256(repr(key).encode('utf-8')).hexdigest(), recipe.updated_at)
+
 class RecipeDetailView(LoginRequiredMixin, DetailView):
   """ Protected DetailView that displays a single recipe's details for logged-in users. """
   model = Recipe
   template_name = 'recipes/recipe_details.html'
 
   def get_object(self, queryset=None):
-    """ Override get_object() to handle cases where a recipe no longer exists. Displays an error message and returns None if the recipe is deleted. """
-    try:
-      return super().get_object(queryset)
-    except Recipe.DoesNotExist:
-      messages.error(self.request, 'The recipe no longer exists. Redirecting...')
-      return None
-    
+    """ Fetch the recipe once (from the object cache), limited to the recipes the user can see. """
+    recipe = get_visible_recipe(self.request, self.kwargs['pk'])
+    if recipe is None:
+      raise Http404('The recipe does not exist.')
+    return recipe
+
+  @method_decorator(cache_control(private=True, no_cache=True))
+  @method_decorator(condition(
+    etag_func=lambda request, pk: detail_validators(request, pk)[0],
+    last_modified_func=lambda request, pk: detail_validators(request, pk)[1],
+  ))
   def get(self, request, *args, **kwargs):
-    """ Override get() to check if the recipe exists before rendering. If the recipe is missing, redirect to the recipes list page. """
-    obj = self.get_object()
-    if obj is None:
-      return HttpResponseRedirect(reverse('recipes:recipe_list'))
+    """ Render the recipe, or answer 304 if the client's copy is still current. """
     return super().get(request, *args, **kwargs)
 
+  def render_to_response(self, context, **response_kwargs):
+    """ Render the template right away, so its time is measured as the 'template' span. """
+    with timing_span('template'):
+      return super().render_to_response(context, **response_kwargs).render()
+
 def home(request):
   """ Render homepage for all users (publicly accessible). Displays landing page with an intro to BiteBase. """
   return render(request, 'recipes/recipes_home.html')
 
+def get_search_filters(request):
+  """ Retrieve user search inputs from the query string. """
+  return {
+    'q': request.GET.get('q', '').strip(),
+    'recipe_name': request.GET.get('recipe_name', '').strip(),
+    'ingredient': request.GET.get('ingredient', '').strip(),
+    'difficulty': request.GET.get('difficulty', ''),
+  }
+
+def get_user_recipes(user):
+  """ Determine which recipes to show: the user's own recipes plus the shared public recipes they haven't hidden. """
+  return Recipe.objects.visible_to(user)
+
+def filter_recipes(qs_recipes, filters):
+  """ Apply search filters if any search criteria are provided. """
+  if filters['q'] or filters['recipe_name']:
+    # Full-text search (keywords anywhere, recipe name terms in the name only)
+    qs_recipes = get_search_backend().filter(qs_recipes, text=filters['q'], name=filters['recipe_name'])
+  if filters['ingredient']:
+    # Exact match on the normalized ingredient table (indexed join, no "egg" -> "eggplant" matches)
+    qs_recipes = qs_recipes.filter(ingredient_items__name=normalize_ingredient(filters['ingredient']))
+  if filters['difficulty']:
+    # The form submits difficulty labels; the column stores their enum values
+    difficulty = {label: value for value, label in Difficulty.choices}.get(filters['difficulty'])
+    qs_recipes = qs_recipes.filter(difficulty=difficulty) if difficulty else qs_recipes.none()
+  return qs_recipes
+
+# Recipe ids are signed 64-bit integers (BigAutoField); the database rejects anything larger
+MIN_RECIPE_ID, MAX_RECIPE_ID = -2 ** 63, 2 ** 63 - 1
+
+def is_recipe_id(pk):
+  """ Whether pk fits in the recipe id column (so it can be compared with ids in a query). """
+  return MIN_RECIPE_ID <= pk <= MAX_RECIPE_ID
+
+def parse_cursor(value, ranked=False):
+  """
+  Parse a pagination cursor: a recipe id, or "rank:id" for ranked search results.
+  Invalid or missing cursors (including ids out of the id range and non-finite ranks) are ignored.
+  """
+  try:
+    if ranked:
+      rank, pk = value.rsplit(':', 1)
+      rank, pk = float(rank), int(pk)
+      return (rank, pk) if math.isfinite(rank) and is_recipe_id(pk) else None
+    pk = int(value)
+    return pk if is_recipe_id(pk) else None
+  except (AttributeError, TypeError, ValueError):
+    return None
+
+def format_cursor(recipe, rank_field=None):
+  """ Format the pagination cursor for a recipe (see parse_cursor). """
+  if rank_field:
+    return f'{getattr(recipe, rank_field)!r}:{recipe.pk}'
+  return recipe.pk
+
+def get_keyset_page(qs_recipes, after=None, before=None, page_size=24, rank_field=None):
+  """
+  Keyset pagination: fetches one page of recipes with a single query, ordered by id,
+  or by (rank_field, id) for ranked search results.
+  Uses "key > after" / "key < before" instead of OFFSET, so every page costs the same.
+  Returns (recipes, next_cursor, previous_cursor); cursors are None when there is no such page.
+  """
+  def beyond(cursor, lookup):
+    """ Recipes strictly after ('gt') or before ('lt') the cursor in page order. """
+    if rank_field:
+      rank, pk = cursor
+      return Q(**{f'{rank_field}__{lookup}': rank}) | Q(**{rank_field: rank, f'pk__{lookup}': pk})
+    return Q(**{f'pk__{lookup}': cursor})
+
+  ordering = [rank_field, 'pk'] if rank_field else ['pk']
+
+  if before is not None:
+    # Walk backwards from the cursor, then restore page order
+    rows = list(qs_recipes.filter(beyond(before, 'lt')).order_by(*[f'-{field}' for field in ordering])[:page_size + 1])
+    has_previous = len(rows) > page_size
+    recipes = rows[:page_size][::-1]
+    # A stale or tampered cursor may point past the last recipe, so check what follows the page
+    if recipes:
+      last = (getattr(recipes[-1], rank_field), recipes[-1].pk) if rank_field else recipes[-1].pk
+      has_next = qs_recipes.filter(beyond(last, 'gt')).exists()
+    else:
+      has_next = False
+  else:
+    if after is not None:
+      qs_recipes = qs_recipes.filter(beyond(after, 'gt'))
+    # Fetch one extra row to know whether another page exists
+    rows = list(qs_recipes.order_by(*ordering)[:page_size + 1])
+    has_next = len(rows) > page_size
+    recipes = rows[:page_size]
+    has_previous = after is not None
+
+  next_cursor = format_cursor(recipes[-1], rank_field) if recipes and has_next else None
+  previous_cursor = format_cursor(recipes[0], rank_field) if recipes and has_previous else None
+  return recipes, next_cursor, previous_cursor
+
+def recipes_to_dataframe(recipes):
+  """ Build a DataFrame from already-fetched recipes (same columns as QuerySet.values()), without another query. """
+  fields = Recipe._meta.concrete_fields
+
+  def column_value(recipe, field):
+    value = field.value_from_object(recipe)
+    # Use the stored file name for images (like values() does) so the storage backend isn't queried
+    if isinstance(field, FileField):
+      return value.name
+    # Show the label of enum columns (difficulty, time bucket) rather than the stored number
+    return dict(field.flatchoices).get(value, value) if field.choices else value
+
+  return get_pandas().DataFrame(
+    [{field.attname: column_value(recipe, field) for field in fields} for recipe in recipes],
+    columns=[field.attname for field in fields]
+  )
+
+def get_chart_key(request):
+  """ Charts are identified by user, search filters, chart type, image format and recipe version stamp. """
+  filters = get_search_filters(request)
+  return (
+    request.user.id,
+    request.user.is_superuser,
+    filters['q'].lower(),
+    filters['recipe_name'].lower(),
+    filters['ingredient'].lower(),
+    filters['difficulty'],
+    request.GET.get('chart_type', ''),
+    request.GET.get('format', 'png'),
+    get_scope_version(request.user),
+  )
+
+def chart_etag(request):
+  """ ETag for a chart image, derived from the chart key (which includes the recipe version stamp). """
+  if not request.user.is_authenticated:
+    return None
+  return hashlib.sha256(repr(get_chart_key(request)).encode('utf-8')).hexdigest()
+
+def get_chart_data(chart_type, qs_recipes):
+  """
+  Aggregate the chart data in the database, so only a handful of numbers are transferred.
+  Returns a Series of counts indexed by difficulty ("#1"), time bucket ("#2") or ingredient ("#3").
+  """
+  if chart_type == '#1':
+    rows = qs_recipes.order_by().values('difficulty').annotate(count=Count('id')).values_list('difficulty', 'count')
+    rows = [(Difficulty(difficulty).label, count) for difficulty, count in rows]
+
+  elif chart_type == '#2':
+    # Group by the precomputed cooking-time bucket (recipes with negative times have none)
+    rows = (
+      qs_recipes
+      .filter(time_bucket__isnull=False)
+      .order_by()
+      .values('time_bucket')
+      .annotate(count=Count('id'))
+      .values_list('time_bucket', 'count')
+    )
+    rows = [(TIME_LABELS[time_bucket - 1], count) for time_bucket, count in rows]
+
+  else:
+    # Count ingredients with a join on the normalized ingredient table
+    rows = (
+      Ingredient.objects
+      .filter(recipes__in=qs_recipes)
+      .annotate(count=Count('recipes'))
+      .order_by('-count', 'name')
+      .values_list('name', 'count')[:5]
+    )
+
+  return counts_to_series(rows)
+
+def get_stats_chart_data(chart_type, user):
+  """
+  Read the chart data for everything the user can see from the RecipeStats rollup (two rows, no aggregation).
+  Returns the same Series as get_chart_data().
+  """
+  totals = RecipeStats.objects.totals_for(user)
+  if chart_type == '#1':
+    rows = [(Difficulty(difficulty).label, count) for difficulty, count in sorted(totals['difficulty'].items()) if count > 0]
+  elif chart_type == '#2':
+    rows = [(TIME_LABELS[time_bucket - 1], count) for time_bucket, count in sorted(totals['time_bucket'].items()) if count > 0]
+  else:
+    ingredients = [(name, count) for name, count in totals['ingredients'].items() if count > 0]
+    rows = sorted(ingredients, key=lambda item: (-item[1], item[0]))[:5]
+  return counts_to_series(rows)
+
+def counts_to_series(rows):
+  """ Build a Series of counts from (label, count) rows. """
+  rows = list(rows)
+  return get_pandas().Series([count for _, count in rows], index=[key for key, _ in rows], dtype='int64')
+
+def list_etag(request):
+  """ ETag for the recipe list: the recipes matching the search filters (not only the visible page). """
+  if not request.user.is_authenticated:
+    return None
+  return get_page_etag(request, filter_recipes(get_user_recipes(request.user), get_search_filters(request)))
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=list_etag) # Hides and deletes don't show in a timestamp: the ETag is the only validator
 def recipe_list(request):
-  """ Display the list of recipes, apply search filters, and generate charts. """
+  """ Display the list of recipes, apply search filters, and link to the selected chart. """
   
   form = RecipeSearchForm(request.GET or None)
   
   # Retrieve and remove any stored message about a deleted recipe
   deleted_recipe_message = request.session.pop('deleted_recipe_message', None)
 
-  # Determine which recipes to show: Superusers see all; regular users see only their own
-  if request.user.is_superuser:
-    qs_recipes = Recipe.objects.filter(Q(user=request.user) | Q(user__isnull=True))
-  else:
-    qs_recipes = Recipe.objects.filter(user=request.user)
-
-  # If a non-superuser has no recipes, clone public recipes for them
-  if not qs_recipes.exists() and not request.user.is_superuser:
-    public_recipes = Recipe.objects.filter(user__isnull=True)
-    
-    for recipe in public_recipes:
-      Recipe.objects.create(
-        user=request.user,
-        name=recipe.name,
-        cooking_time=recipe.cooking_time,
-        ingredients=recipe.ingredients,
-        difficulty=recipe.difficulty,
-        description=recipe.description,
-        pic=recipe.pic,
-      )
-
-    # Fetch updated list of user-specific recipes
-    qs_recipes = Recipe.objects.filter(user=request.user)
+  # Public recipes are shared, so there is nothing to clone for new users
+  qs_recipes = get_user_recipes(request.user)
 
   # Get user's display name (use full name if available, otherwise username)
   display_name = request.user.get_full_name() if request.user.get_full_name() else request.user.username
 
   recipes_df = None
-  chart = None
+  chart_url = None
   chart_error_msg = None
 
-  # Retrieve user search inputs
-  recipe_name = request.GET.get('recipe_name', '').strip()
-  ingredient = request.GET.get('ingredient', '').strip()
-  difficulty = request.GET.get('difficulty', '')
+  filters = get_search_filters(request)
   chart_type = request.GET.get('chart_type', '')
+  qs_recipes = filter_recipes(qs_recipes, filters)
+
+  # Text searches are ranked by relevance (with highlighted snippets); otherwise recipes are listed by id
+  ranked = bool(filters['q'] or filters['recipe_name'])
+  if ranked:
+    qs_recipes = get_search_backend().annotate(qs_recipes, text=filters['q'], name=filters['recipe_name'])
+
+  # Fetch one page of the filtered recipes exactly once; the table and the recipe cards both use this list
+  recipes, next_cursor, previous_cursor = get_keyset_page(
+    qs_recipes,
+    after=parse_cursor(request.GET.get('after'), ranked),
+    before=parse_cursor(request.GET.get('before'), ranked),
+    page_size=settings.RECIPES_PAGE_SIZE,
+    rank_field='search_rank' if ranked else None,
+  )
+  # Snippets are only built for the visible page
+  get_search_backend().highlight(recipes, text=filters['q'], name=filters['recipe_name'])
+  for recipe in recipes:
+    recipe.search_highlight = format_highlight(recipe.search_highlight)
+
+  # Pagination links keep the search filters and chart selection
+  page_params = {**filters, 'chart_type': chart_type}
+
+  # An empty page reached through an out-of-date cursor is not an empty search result
+  no_results_message = None
+  empty_page_url = None
+  if not recipes:
+    if request.GET.get('after') or request.GET.get('before'):
+      empty_page_url = f'?{urlencode(page_params)}'
+    else:
+      no_results_message = 'No recipes match your search criteria.'
+  next_url = f'?{urlencode({**page_params, "after": next_cursor})}' if next_cursor else None
+  previous_url = f'?{urlencode({**page_params, "before": previous_cursor})}' if previous_cursor else None
+
+  # Convert the visible page to DataFrame and convert DataFrame to HTML table (if results exist)
+  if recipes:
+    with timing_span('table'):
+      recipes_df = recipes_to_dataframe(recipes)
+      recipes_df = recipes_df.to_html()
+
+    if chart_type in CHART_TYPES:
+      # The chart is served by its own (cacheable) image endpoint
+      chart_url = f"{reverse('recipes:recipe_chart')}?{urlencode({**filters, 'chart_type': chart_type})}"
+    elif chart_type:
+      chart_error_msg = 'Invalid chart type selected. Please choose a valid chart.'
+
+  with timing_span('template'):
+    return render(request, 'recipes/recipes_list.html', {
+      'object_list': recipes, # 'object_list' is default naming and is really just the fetched 'qs_recipes'
+      'form': form,
+      'recipes_df': recipes_df,
+      'chart_url': chart_url,
+      'chart_error_msg': chart_error_msg,
+      'deleted_recipe_message': deleted_recipe_message,
+      'no_results_message': no_results_message,
+      'empty_page_url': empty_page_url,
+      'next_url': next_url,
+      'previous_url': previous_url,
+      'display_name': display_name
+    })
 
-  # Apply filters if any search criteria are provided
-  if recipe_name or ingredient or difficulty:
-    if recipe_name:
-      qs_recipes = qs_recipes.filter(name__icontains=recipe_name)
-    if ingredient:
-      qs_recipes = qs_recipes.filter(ingredients__icontains=ingredient)
-    if difficulty:
-      qs_recipes = qs_recipes.filter(difficulty=difficulty)
-
-  no_results_message = 'No recipes match your search criteria.' if not qs_recipes.exists() else None
-
-  # Convert QuerySet to DataFrame and convert DataFrame to HTML table (if results exist)
-  if qs_recipes.exists():
-    recipes_df = pd.DataFrame(qs_recipes.values())
-    recipes_df = recipes_df.to_html()
-
-    if chart_type:
-      chart = get_chart(chart_type, pd.DataFrame(qs_recipes.values()))
-      if chart is None:
-        chart_error_msg = 'Invalid chart type selected. Please choose a valid chart.'
-
-  return render(request, 'recipes/recipes_list.html', {
-    'object_list': qs_recipes, # 'object_list' is default naming and is really just 'qs_recipes'
-    'form': form,
-    'recipes_df': recipes_df,
-    'chart': chart,
-    'chart_error_msg': chart_error_msg,
-    'deleted_recipe_message': deleted_recipe_message,
-    'no_results_message': no_results_message,
-    'display_name': display_name
-  })
+@login_required
+@condition(etag_func=chart_etag) # Version stamps are counters, not times: the ETag is the only validator
+def recipe_chart(request):
+  """ Serve a chart for the filtered recipes as a PNG (or SVG) image, with conditional GET support. """
+
+  chart_type = request.GET.get('chart_type', '')
+  image_format = request.GET.get('format', 'png')
+
+  if chart_type not in CHART_TYPES or image_format not in CHART_FORMATS:
+    raise Http404('Invalid chart type or image format.')
+
+  chart_key = get_chart_key(request)
+  chart = chart_cache.get(chart_key)
+
+  if chart is None:
+    filters = get_search_filters(request)
+    with timing_span('chart_data'):
+      if any(filters.values()):
+        data = get_chart_data(chart_type, filter_recipes(get_user_recipes(request.user), filters))
+      else:
+        data = get_stats_chart_data(chart_type, request.user) # Unfiltered charts come from the stats rollup
+    if chart_type in ('#1', '#2') and not data.sum():
+      raise Http404('No recipes match your search criteria.')
+
+    with timing_span('chart'):
+      chart = render_chart(chart_type, data, image_format)
+    chart_cache.set(chart_key, chart)
+
+  response = HttpResponse(chart, content_type=CHART_FORMATS[image_format])
+  # Charts are private to the user, but the browser may reuse them after revalidating the ETag
+  response['Cache-Control'] = 'private, no-cache'
+  return response
 
 @login_required
 def create_recipe_view(request):
@@ -160,6 +456,8 @@ def create_recipe_view(request):
       # Save finalized recipe
       recipe.save()
       success_message = f'"{recipe.name}" created successfully!'
+      if recipe.is_pic_pending():
+        success_message += ' Its picture will appear once it has been processed.'
       # Reset form after successful submission
       form = CreateRecipeForm()
 
@@ -184,8 +482,8 @@ def create_recipe_view(request):
 def edit_recipe_view(request, pk):
   """ Allow users to edit an existing recipe. """
 
-  # Retrieve recipe by primary key
-  recipe = Recipe.objects.filter(pk=pk).first()
+  # Retrieve recipe by primary key (only recipes visible to the user can be edited)
+  recipe = Recipe.objects.visible_to(request.user).filter(pk=pk).first()
 
   if recipe is None:
     messages.error(request, 'The recipe no longer exists. Redirecting to recipes list.')
@@ -195,8 +493,15 @@ def edit_recipe_view(request, pk):
     form = CreateRecipeForm(request.POST, request.FILES, instance=recipe)
 
     if form.is_valid():
-      form.save()
+      if recipe.is_public() and not request.user.is_superuser:
+        # Copy-on-write: the edits are saved as the user's own copy and the public recipe is hidden for them
+        recipe = form.save(commit=False)
+        recipe.save_as_private_copy(request.user)
+      else:
+        form.save()
       success_message = f'"{recipe.name}" has been successfully updated!'
+      if recipe.is_pic_pending():
+        success_message += ' Its picture will appear once it has been processed.'
       
       # Reload form after updating recipe, displaying success message
       return render(
@@ -224,14 +529,19 @@ def edit_recipe_view(request, pk):
 def delete_recipe_view(request, pk):
   """ Handles recipe deletion, ensuring proper redirection and session message. """
   
-  # Retrieve recipe object or return a 404 if not found
-  recipe = get_object_or_404(Recipe, pk=pk)
+  # Retrieve recipe object or return a 404 if not found (or not visible to the user)
+  recipe = get_object_or_404(Recipe.objects.visible_to(request.user), pk=pk)
   
   if request.method == 'POST':
     # Store name before deletion
     recipe_name = recipe.name
-    # Delete recipe from database
-    recipe.delete()
+
+    if recipe.is_public() and not request.user.is_superuser:
+      # Public recipes are shared, so only hide it from this user
+      HiddenRecipe.objects.get_or_create(user=request.user, recipe=recipe)
+    else:
+      # Delete recipe from database
+      recipe.delete()
 
     # Store success message in session to persist across redirection
     request.session['deleted_recipe_message'] = f'Recipe "{recipe_name}" was successfully deleted.'
@@ -311,21 +621,7 @@ def signup_view(request):
       login(request, user)
       success_message = 'User has been successfully created!'
 
-      # Clone public recipes from the superuser to the newly created user
-      superuser = User.objects.get(username='evandanowitz') # Retrieve the superuser account
-      public_recipes = Recipe.objects.filter(user=superuser) # Get all public recipes
-      
-      for recipe in public_recipes:
-        # Create a copy of each public recipe for the new user
-        Recipe.objects.create(
-          user=user,
-          name=recipe.name,
-          cooking_time=recipe.cooking_time,
-          ingredients=recipe.ingredients,
-          difficulty=recipe.difficulty,
-          description=recipe.description,
-          pic=recipe.pic,
-        )
+      # No recipes are copied: new users see the shared public recipes (copy-on-write on edit/delete)
 
       # Reset form after successful signup
       form = SignupForm()